@@ -0,0 +1,86 @@
+import re
+from bisect import bisect_right
+
+# Aspect terms seeded from the data_generation.py review themes and the side-effect
+# vocabulary of the UCI drug reviews (sideEffectsReview / commentsReview)
+ASPECT_LEXICON = {
+    'wait_time': [
+        'wait', 'waits', 'waited', 'waiting', 'wait time', 'wait times', 'waiting time', 'delay', 'delays',
+        'delayed', 'long delays', 'late', 'hours', 'queue', 'on hold', 'minimal wait time', 'quick appointment',
+    ],
+    'staff': [
+        'staff', 'doctor', 'doctors', 'dr', 'physician', 'physicians', 'nurse', 'nurses', 'nursing',
+        'receptionist', 'receptionists', 'reception', 'front desk', 'surgeon', 'specialist', 'provider',
+        'medical team', 'team', 'personnel', 'pharmacist', 'bedside manner',
+    ],
+    'billing': [
+        'bill', 'bills', 'billing', 'billed', 'charge', 'charges', 'charged', 'cost', 'costs', 'price',
+        'prices', 'pricing', 'overpriced', 'expensive', 'insurance', 'copay', 'co-pay', 'payment', 'fee',
+        'fees', 'invoice', 'price paid',
+    ],
+    'facility': [
+        'facility', 'facilities', 'clinic', 'hospital', 'office', 'room', 'rooms', 'waiting room',
+        'equipment', 'building', 'parking', 'environment', 'bathroom', 'bathrooms', 'cleanliness',
+        'medical office environment',
+    ],
+    'medication_side_effects': [
+        'side effect', 'side effects', 'medication', 'medications', 'medicine', 'drug', 'drugs', 'dose',
+        'dosage', 'pill', 'pills', 'prescription', 'nausea', 'nauseous', 'vomiting', 'dizziness', 'dizzy',
+        'headache', 'headaches', 'drowsy', 'drowsiness', 'insomnia', 'fatigue', 'tired', 'weight gain',
+        'rash', 'dry mouth', 'constipation', 'diarrhea', 'withdrawal',
+    ],
+}
+
+# Clause boundaries: sentence punctuation and contrastive conjunctions
+SEGMENT_PATTERN = re.compile(r'[.!?;]+|\b(?:but|however|although|though|whereas)\b', re.IGNORECASE)
+
+
+def normalize_term(term):
+    return re.sub(r'[\s-]+', ' ', term.lower())
+
+
+def compile_aspect_index(lexicon=ASPECT_LEXICON):
+    """One alternation regex over every aspect term (longest first) and its term -> aspect map"""
+    term_aspects = {normalize_term(term): aspect for aspect, terms in lexicon.items() for term in terms}
+    alternatives = sorted(term_aspects, key=len, reverse=True)
+    pattern = r'\b(?:' + '|'.join(re.escape(term).replace(r'\ ', r'[\s-]+') for term in alternatives) + r')\b'
+    return re.compile(pattern, re.IGNORECASE), term_aspects
+
+
+ASPECT_INDEX = compile_aspect_index()
+ASPECTS = list(ASPECT_LEXICON)
+
+
+def find_aspect_windows(texts, index=ASPECT_INDEX):
+    """Text position, aspect, clause window and matched terms for every aspect mentioned in texts"""
+    pattern, term_aspects = index
+    rows, aspects, windows, mentions = [], [], [], []
+
+    for row, text in enumerate(texts):
+        found = {}
+        for match in pattern.finditer(text):
+            found.setdefault(term_aspects[normalize_term(match.group(0))], []).append(match)
+        if not found:
+            continue
+
+        separators = list(SEGMENT_PATTERN.finditer(text))
+        starts = [0] + [s.end() for s in separators]
+        ends = [s.start() for s in separators] + [len(text)]
+        for aspect, matches in found.items():
+            # Every clause that mentions the aspect, in order, joined into one window
+            segments = sorted({bisect_right(starts, m.start()) - 1 for m in matches})
+            rows.append(row)
+            aspects.append(aspect)
+            windows.append('. '.join(text[starts[s]:ends[s]].strip() for s in segments))
+            mentions.append(sorted({normalize_term(m.group(0)) for m in matches}))
+
+    return rows, aspects, windows, mentions
+
+
+def group_aspects(n_texts, rows, aspects, mentions, sentiments, confidences):
+    """Per-text lists of {aspect, sentiment, confidence, mentions} from scored windows"""
+    results = [[] for _ in range(n_texts)]
+    for row, aspect, terms, sentiment, confidence in zip(rows, aspects, mentions, sentiments, confidences):
+        results[row].append({"aspect": aspect, "sentiment": sentiment,
+                             "confidence": round(confidence, 3), "mentions": terms})
+    return results
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def fit_calibration(probabilities, y_true, classes):
+    """Fit per-class isotonic calibration and export it as np.interp lookup tables"""
+    from sklearn.isotonic import IsotonicRegression
+
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    y_true = np.asarray(y_true)
+    if probabilities.ndim != 2 or probabilities.shape[1] != len(classes):
+        raise ValueError(f"Expected one probability column per class ({len(classes)}), got shape {probabilities.shape}")
+    if len(y_true) != len(probabilities):
+        raise ValueError(f"Got {len(y_true)} labels for {len(probabilities)} probability rows")
+    tables = {'classes': list(classes), 'x': [], 'y': []}
+
+    for k, label in enumerate(classes):
+        # One-vs-rest: map the raw probability of class k to the observed hit rate
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+        iso.fit(probabilities[:, k], (y_true == label).astype(np.float64))
+        tables['x'].append(iso.X_thresholds_.astype(np.float32))
+        tables['y'].append(iso.y_thresholds_.astype(np.float32))
+
+    return tables
+
+
+def apply_calibration(probabilities, tables):
+    """Map predict_proba rows through the calibration tables and renormalise them"""
+    probabilities = np.atleast_2d(np.asarray(probabilities, dtype=np.float64))
+    if probabilities.shape[1] != len(tables['x']):
+        raise ValueError(f"Calibration has {len(tables['x'])} class tables, got {probabilities.shape[1]} probability columns")
+    calibrated = np.empty_like(probabilities)
+
+    for k in range(probabilities.shape[1]):
+        calibrated[:, k] = np.interp(probabilities[:, k], tables['x'][k], tables['y'][k])
+
+    # A row can map to all zeros when every class lands on the bottom step
+    totals = calibrated.sum(axis=1, keepdims=True)
+    uniform = np.full_like(calibrated, 1.0 / calibrated.shape[1])
+    return np.divide(calibrated, totals, out=uniform, where=totals > 0)
+
+
+def expected_calibration_error(probabilities, y_true, classes, n_bins=10):
+    """Expected calibration error of the top-class confidence"""
+    probabilities = np.atleast_2d(np.asarray(probabilities, dtype=np.float64))
+    predicted = np.asarray(classes)[probabilities.argmax(axis=1)]
+    confidence = probabilities.max(axis=1)
+    correct = (predicted == np.asarray(y_true)).astype(np.float64)
+
+    bins = np.minimum((confidence * n_bins).astype(int), n_bins - 1)
+    confidence_sums = np.bincount(bins, weights=confidence, minlength=n_bins)
+    correct_sums = np.bincount(bins, weights=correct, minlength=n_bins)
+
+    return np.abs(confidence_sums - correct_sums).sum() / max(len(confidence), 1)
@@ -0,0 +1,51 @@
+import numpy as np
+from calibration import apply_calibration
+
+
+def score_stage(model, X, calibration=None):
+    """Predict labels with one model and return the (calibrated) confidence of each label"""
+    probabilities = model.predict_proba(X)
+    indices = probabilities.argmax(axis=1)
+    if calibration is not None:
+        probabilities = apply_calibration(probabilities, calibration)
+    return model.classes_[indices], probabilities[np.arange(len(indices)), indices]
+
+
+def tune_cascade_threshold(fast_predictions, fast_confidence, slow_predictions, y_true,
+                           tolerance=0.005, grid_size=101):
+    """Pick the lowest confidence threshold whose cascade accuracy is within tolerance of the best"""
+    y_true = np.asarray(y_true)
+    lengths = {len(fast_predictions), len(fast_confidence), len(slow_predictions), len(y_true)}
+    if len(lengths) != 1:
+        raise ValueError("fast_predictions, fast_confidence, slow_predictions and y_true must have the same length")
+    if len(y_true) == 0:
+        raise ValueError("Cannot tune the cascade threshold on an empty validation split")
+    fast_correct = np.asarray(fast_predictions) == y_true
+    slow_correct = np.asarray(slow_predictions) == y_true
+
+    # One row per candidate threshold; the last one routes everything to the slow model
+    thresholds = np.append(np.linspace(0.0, 1.0, grid_size), np.inf)
+    routed = np.asarray(fast_confidence)[None, :] < thresholds[:, None]
+    accuracy = np.where(routed, slow_correct, fast_correct).mean(axis=1)
+    routed_fraction = routed.mean(axis=1)
+
+    best = np.flatnonzero(accuracy >= accuracy.max() - tolerance)[0]
+    return float(thresholds[best]), float(accuracy[best]), float(routed_fraction[best])
+
+
+def predict_cascade(X, cascade):
+    """Score X with the fast model and re-score only the uncertain rows with the slow model"""
+    missing = {'fast_model', 'slow_model', 'threshold'} - set(cascade)
+    if missing:
+        raise ValueError(f"Cascade is missing {', '.join(sorted(missing))}")
+    predictions, confidence = score_stage(cascade['fast_model'], X, cascade.get('fast_calibration'))
+    uncertain = confidence < cascade['threshold']
+    stages = np.where(uncertain, 'slow', 'fast')
+
+    if uncertain.any():
+        rows = np.flatnonzero(uncertain)
+        predictions = predictions.copy()
+        predictions[rows], confidence[rows] = score_stage(
+            cascade['slow_model'], X[rows], cascade.get('slow_calibration'))
+
+    return predictions, confidence, stages
@@ -0,0 +1,283 @@
+import hashlib
+import os
+import re
+import zlib
+import numpy as np
+
+# Integer types of quantized artifacts' log-probabilities, by bit width
+QUANTIZED_DTYPES = {8: np.int8, 16: np.int16}
+# File name of the quantized artifact written next to sentiment_model.npz
+QUANTIZED_FILE = 'sentiment_model.int{bits}.npz'
+# Integer steps that unit-normalized TF-IDF values in [0, 1] are rounded to when scoring quantized models
+FEATURE_LEVELS = 2 ** 15 - 1
+
+
+class SparseRows:
+    """Minimal CSR container (data, indices, indptr) produced by CompactVectorizer"""
+
+    def __init__(self, data, indices, indptr, n_features):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = (len(indptr) - 1, n_features)
+
+    def row_ids(self):
+        """Row number of every stored value"""
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def __getitem__(self, rows):
+        """The given rows (an integer index array) as a new SparseRows, like scipy's X[rows]"""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        # Position in data/indices of every value copied, row by row
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return SparseRows(self.data[positions], self.indices[positions], indptr, self.shape[1])
+
+
+class CompactVectorizer:
+    """NumPy-only re-implementation of a fitted word-level TfidfVectorizer's transform"""
+
+    def __init__(self, terms, idf, stop_words, token_pattern, ngram_range, lowercase, sublinear_tf, norm,
+                 dtype=np.float64):
+        self.vocabulary_ = {term: index for index, term in enumerate(terms)}
+        self.idf_ = idf
+        self.stop_words = stop_words
+        self.token_pattern = re.compile(token_pattern)
+        self.ngram_range = ngram_range
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.dtype = dtype
+
+    def analyze(self, text):
+        """Tokens and n-grams exactly as sklearn's word analyzer produces them"""
+        if self.lowercase:
+            text = text.lower()
+        tokens = [t for t in self.token_pattern.findall(text) if t not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def transform(self, texts):
+        """TF-IDF rows for texts as a SparseRows matrix"""
+        data, indices, indptr = [], [], [0]
+        for text in texts:
+            counts = {}
+            for term in self.analyze(text):
+                index = self.vocabulary_.get(term)
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+            indices.extend(counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+
+        X = SparseRows(np.asarray(data, dtype=self.dtype), np.asarray(indices, dtype=np.int32),
+                       np.asarray(indptr, dtype=np.int64), len(self.idf_))
+        if self.sublinear_tf:
+            X.data = np.log(X.data) + 1
+        X.data *= self.idf_[X.indices]
+
+        if self.norm:
+            rows = X.row_ids()
+            weights = X.data ** 2 if self.norm == 'l2' else np.abs(X.data)
+            norms = np.bincount(rows, weights=weights, minlength=X.shape[0])
+            if self.norm == 'l2':
+                norms = np.sqrt(norms)
+            X.data /= norms[rows]
+        return X
+
+
+class CompactNB:
+    """NumPy-only MultinomialNB/ComplementNB scorer over SparseRows"""
+
+    def __init__(self, model_type, classes, feature_log_prob, class_log_prior):
+        self.model_type = model_type
+        self.classes_ = classes
+        self.feature_log_prob_ = feature_log_prob
+        self.class_log_prior_ = class_log_prior
+        self.n_features_in_ = feature_log_prob.shape[1]
+
+    def joint_log_likelihood(self, X):
+        rows = X.row_ids()
+        contributions = self.feature_log_prob_[:, X.indices] * X.data
+        jll = np.zeros((X.shape[0], len(self.classes_)))
+        for k, class_contributions in enumerate(contributions):
+            jll[:, k] = np.bincount(rows, weights=class_contributions, minlength=X.shape[0])
+        # ComplementNB only adds the prior in the degenerate single-class case
+        if self.model_type == 'MultinomialNB' or len(self.classes_) == 1:
+            jll += self.class_log_prior_
+        return jll
+
+    def predict_proba(self, X):
+        jll = self.joint_log_likelihood(X)
+        jll -= jll.max(axis=1, keepdims=True)
+        probabilities = np.exp(jll)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[self.joint_log_likelihood(X).argmax(axis=1)]
+
+
+class QuantizedNB(CompactNB):
+    """CompactNB that scores with integer log-probabilities (one scale per class) and integer TF-IDF values"""
+
+    def __init__(self, model_type, classes, quantized_log_prob, scales, class_log_prior):
+        self.model_type = model_type
+        self.classes_ = classes
+        self.quantized_log_prob_ = quantized_log_prob
+        self.scales_ = scales
+        self.class_log_prior_ = class_log_prior
+        self.n_features_in_ = quantized_log_prob.shape[1]
+
+    @property
+    def feature_log_prob_(self):
+        """Dequantized class-centred log-probabilities"""
+        return self.quantized_log_prob_ * self.scales_[:, None]
+
+    def joint_log_likelihood(self, X):
+        values = np.rint(X.data * FEATURE_LEVELS).astype(np.int64)
+        products = self.quantized_log_prob_[:, X.indices] * values
+        # Exact int64 row sums as differences of a running total at the row boundaries
+        totals = np.zeros((len(self.classes_), len(values) + 1), dtype=np.int64)
+        np.cumsum(products, axis=1, out=totals[:, 1:])
+        sums = totals[:, X.indptr[1:]] - totals[:, X.indptr[:-1]]
+        jll = sums.T * (self.scales_ / FEATURE_LEVELS)
+        if self.model_type == 'MultinomialNB' or len(self.classes_) == 1:
+            jll += self.class_log_prior_
+        return jll
+
+
+def quantize_log_prob(feature_log_prob, bits):
+    """Class-centred log-probabilities as int8/int16 with one scale per class; returns (quantized, scales)"""
+    dtype = QUANTIZED_DTYPES[bits]
+    # Subtracting each feature's mean over classes shifts every class score of a row by the same
+    # amount, which predict_proba's softmax cancels, and leaves a much narrower range to quantize
+    centred = feature_log_prob - feature_log_prob.mean(axis=0)
+    scales = np.abs(centred).max(axis=1) / np.iinfo(dtype).max
+    scales[scales == 0] = 1.0
+    return np.rint(centred / scales[:, None]).astype(dtype), scales
+
+
+def string_table(strings):
+    """Newline-joined UTF-8 bytes of strings as a uint8 array (NumPy unicode arrays take 4 bytes a character)"""
+    return np.frombuffer('\n'.join(strings).encode('utf-8'), dtype=np.uint8)
+
+
+def read_strings(artifact, name):
+    """Strings stored by string_table, or in the unicode arrays of older artifacts"""
+    joined = artifact[name].tobytes().decode('utf-8') if artifact[name].dtype == np.uint8 else str(artifact[name])
+    return joined.split('\n') if joined else []
+
+
+def pickle_fingerprint(model_path, vectorizer_path):
+    """SHA-256 of the pickled model and vectorizer a compact artifact is exported from"""
+    digest = hashlib.sha256()
+    for path in (model_path, vectorizer_path):
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def matches_pickles(path, model_path, vectorizer_path):
+    """Whether a compact artifact was exported from the pickles next to it (True when there are none)"""
+    if not (os.path.exists(model_path) and os.path.exists(vectorizer_path)):
+        return True
+    with np.load(path, allow_pickle=False) as artifact:
+        if 'fingerprint' not in artifact.files:
+            return False
+        fingerprint = str(artifact['fingerprint'])
+    return fingerprint == pickle_fingerprint(model_path, vectorizer_path)
+
+
+def artifact_sizes(path):
+    """Uncompressed and zlib-compressed bytes of an .npz artifact's arrays, whatever it was saved with"""
+    with np.load(path, allow_pickle=False) as artifact:
+        arrays = [artifact[name] for name in artifact.files]
+    return sum(a.nbytes for a in arrays), sum(len(zlib.compress(a.tobytes())) for a in arrays)
+
+
+def export_compact_model(path, vectorizer, model, calibration=None, quantize_bits=None, fingerprint=None):
+    """Write a fitted word TfidfVectorizer + NB model (and calibration) to a NumPy-only .npz
+
+    With quantize_bits (8 or 16) the log-probabilities are stored as integers with
+    per-class scales, the IDF weights as float32 and the file compressed; the
+    artifact then loads as a QuantizedNB. fingerprint (see pickle_fingerprint)
+    ties the artifact to the pickles it was exported from.
+    """
+    if vectorizer.analyzer != 'word' or vectorizer.tokenizer or vectorizer.preprocessor \
+            or vectorizer.strip_accents or vectorizer.binary or not vectorizer.use_idf:
+        raise ValueError("Only default word-level TF-IDF vectorizers can be exported")
+    if type(model).__name__ not in ('MultinomialNB', 'ComplementNB'):
+        raise ValueError(f"Cannot export {type(model).__name__}; only NB models are supported")
+    if quantize_bits is not None and quantize_bits not in QUANTIZED_DTYPES:
+        raise ValueError(f"Cannot quantize to {quantize_bits} bits; use one of {sorted(QUANTIZED_DTYPES)}")
+    if quantize_bits is not None and vectorizer.norm not in ('l1', 'l2'):
+        raise ValueError("Quantized scoring needs unit-normalized TF-IDF rows (norm='l1' or 'l2')")
+
+    arrays = {
+        'terms': string_table(vectorizer.get_feature_names_out()),
+        'idf': vectorizer.idf_,
+        'stop_words': string_table(sorted(vectorizer.get_stop_words() or [])),
+        'token_pattern': np.array(vectorizer.token_pattern),
+        'ngram_range': np.array(vectorizer.ngram_range),
+        'lowercase': np.array(vectorizer.lowercase),
+        'sublinear_tf': np.array(vectorizer.sublinear_tf),
+        'norm': np.array(vectorizer.norm or ''),
+        'dtype': np.array(np.dtype(vectorizer.dtype).name),
+        'model_type': np.array(type(model).__name__),
+        'classes': model.classes_,
+        'feature_log_prob': model.feature_log_prob_,
+        'class_log_prior': model.class_log_prior_,
+    }
+    if quantize_bits is not None:
+        del arrays['feature_log_prob']
+        arrays['quantized_log_prob'], arrays['quantized_scales'] = quantize_log_prob(model.feature_log_prob_, quantize_bits)
+        arrays['idf'] = vectorizer.idf_.astype(np.float32)
+    if fingerprint is not None:
+        arrays['fingerprint'] = np.array(fingerprint)
+    if calibration is not None:
+        for k, (x, y) in enumerate(zip(calibration['x'], calibration['y'])):
+            arrays[f'calibration_x{k}'] = x
+            arrays[f'calibration_y{k}'] = y
+
+    with open(path, 'wb') as f:
+        (np.savez_compressed if quantize_bits is not None else np.savez)(f, **arrays)
+
+
+def load_compact_model(path):
+    """Load a compact .npz artifact, returning (vectorizer, model, calibration)"""
+    with np.load(path, allow_pickle=False) as artifact:
+        vectorizer = CompactVectorizer(
+            terms=read_strings(artifact, 'terms'),
+            idf=artifact['idf'],
+            stop_words=frozenset(read_strings(artifact, 'stop_words')),
+            token_pattern=str(artifact['token_pattern']),
+            ngram_range=tuple(int(n) for n in artifact['ngram_range']),
+            lowercase=bool(artifact['lowercase']),
+            sublinear_tf=bool(artifact['sublinear_tf']),
+            norm=str(artifact['norm']) or None,
+            # Artifacts exported before the float32 feature path have no dtype entry
+            dtype=np.dtype(str(artifact['dtype'])) if 'dtype' in artifact.files else np.float64,
+        )
+        if 'quantized_log_prob' in artifact.files:
+            model = QuantizedNB(str(artifact['model_type']), artifact['classes'], artifact['quantized_log_prob'],
+                                artifact['quantized_scales'], artifact['class_log_prior'])
+        else:
+            model = CompactNB(str(artifact['model_type']), artifact['classes'],
+                              artifact['feature_log_prob'], artifact['class_log_prior'])
+
+        calibration = None
+        if 'calibration_x0' in artifact.files:
+            calibration = {
+                'classes': list(model.classes_),
+                'x': [artifact[f'calibration_x{k}'] for k in range(len(model.classes_))],
+                'y': [artifact[f'calibration_y{k}'] for k in range(len(model.classes_))],
+            }
+
+    return vectorizer, model, calibration
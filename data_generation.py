@@ -1,7 +1,7 @@
+import argparse
+import os
+import numpy as np
 import pandas as pd
-import random
-
-random.seed(42)
 
 positive_reviews = [
     "The doctor was very professional and caring during my visit",
@@ -57,60 +57,87 @@ neutral_reviews = [
     "Regular healthcare service delivery"
 ]
 
-def create_review_variations(base_reviews, num_variations=3):
-    variations = []
-    prefixes = ["Overall, ", "In my experience, ", "I found that ", ""]
-    suffixes = [" today.", " recently.", " last week.", " during my visit.", ""]
-    
-    for review in base_reviews:
-        variations.append(review)
-        
-        for i in range(num_variations):
-            prefix = random.choice(prefixes)
-            suffix = random.choice(suffixes)
-            varied_review = prefix + review.lower() + suffix
-            variations.append(varied_review)
-    
-    return variations
-
-positive_varied = create_review_variations(positive_reviews)
-negative_varied = create_review_variations(negative_reviews)
-neutral_varied = create_review_variations(neutral_reviews)
-
-reviews_data = []
-sentiments_data = []
-
-reviews_per_sentiment = 500 // 3
-remaining_reviews = 500 % 3
-
-for i in range(reviews_per_sentiment + (1 if remaining_reviews > 0 else 0)):
-    review = random.choice(positive_varied)
-    reviews_data.append(review)
-    sentiments_data.append('positive')
-    if remaining_reviews > 0:
-        remaining_reviews -= 1
-
-for i in range(reviews_per_sentiment + (1 if remaining_reviews > 0 else 0)):
-    review = random.choice(negative_varied)
-    reviews_data.append(review)
-    sentiments_data.append('negative')
-    if remaining_reviews > 0:
-        remaining_reviews -= 1
-
-for i in range(reviews_per_sentiment):
-    review = random.choice(neutral_varied)
-    reviews_data.append(review)
-    sentiments_data.append('neutral')
-
-df = pd.DataFrame({
-    'review': reviews_data,
-    'sentiment': sentiments_data
-})
-
-df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-
-df = df.dropna()
-
-df = df.drop_duplicates(subset=['review'], keep='first')
-
-df.to_csv('healthcare_reviews.csv', index=False)
\ No newline at end of file
+PREFIXES = ["Overall, ", "In my experience, ", "I found that ", ""]
+SUFFIXES = [" today.", " recently.", " last week.", " during my visit.", ""]
+SENTIMENTS = ['positive', 'negative', 'neutral']
+TEMPLATES = [positive_reviews, negative_reviews, neutral_reviews]
+
+
+def parse_weights(value, size=None):
+    """Comma-separated non-negative weights normalised to probabilities"""
+    weights = np.array([float(w) for w in value.split(',')])
+    if (size is not None and len(weights) != size) or (weights < 0).any() or weights.sum() == 0:
+        raise argparse.ArgumentTypeError(f"invalid weights: {value}")
+    return weights / weights.sum()
+
+
+def generate_chunk(rng, n_rows, class_mix, sentence_weights):
+    """DataFrame of n_rows synthetic reviews built with vectorized NumPy sampling"""
+    templates = np.array([t for group in TEMPLATES for t in group])
+    lowered = np.char.lower(templates)
+    offsets = np.cumsum([0] + [len(group) for group in TEMPLATES])[:-1]
+    sizes = np.array([len(group) for group in TEMPLATES])
+    prefixes, suffixes = np.array(PREFIXES), np.array(SUFFIXES)
+
+    labels = rng.choice(len(SENTIMENTS), n_rows, p=class_mix)
+    n_sentences = rng.choice(len(sentence_weights), n_rows, p=sentence_weights) + 1
+
+    # The first sentence is lowercased when a prefix leads into it
+    prefix = rng.integers(len(PREFIXES), size=n_rows)
+    first = offsets[labels] + (rng.random(n_rows) * sizes[labels]).astype(int)
+    reviews = np.char.add(prefixes[prefix], np.where(prefixes[prefix] == '', templates[first], lowered[first]))
+
+    # Further sentences come from the same sentiment's templates, separated by full stops
+    for slot in range(1, len(sentence_weights)):
+        sentence = offsets[labels] + (rng.random(n_rows) * sizes[labels]).astype(int)
+        present = n_sentences > slot
+        reviews = np.char.add(reviews, np.where(present, '. ', ''))
+        reviews = np.char.add(reviews, np.where(present, templates[sentence], ''))
+
+    reviews = np.char.add(reviews, suffixes[rng.integers(len(SUFFIXES), size=n_rows)])
+    return pd.DataFrame({'review': reviews.astype(object), 'sentiment': np.array(SENTIMENTS)[labels]})
+
+
+def write_corpus(path, n_rows, class_mix, sentence_weights, seed=42, chunk_rows=100000):
+    """Stream n_rows generated reviews to a CSV or Parquet file one chunk at a time"""
+    rng = np.random.default_rng(seed)
+    parquet = path.endswith('.parquet')
+    if parquet:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+
+    writer = None
+    with open(path, 'wb' if parquet else 'w', newline='') as f:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = generate_chunk(rng, min(chunk_rows, n_rows - start), class_mix, sentence_weights)
+            if parquet:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(f, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(f, header=start == 0, index=False)
+        if writer is not None:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic healthcare review corpus")
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--output', default='healthcare_reviews.csv', help="Output .csv or .parquet file")
+    parser.add_argument('--class-mix', type=lambda v: parse_weights(v, len(SENTIMENTS)), default='1,1,1',
+                        help="Relative weights of positive,negative,neutral reviews")
+    parser.add_argument('--sentence-weights', type=parse_weights, default='1',
+                        help="Relative weights of reviews with 1,2,3,... sentences")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    write_corpus(args.output, args.rows, args.class_mix, args.sentence_weights, args.seed, args.chunk_rows)
+    print(f"Wrote {args.rows} reviews to {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
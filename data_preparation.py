@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 from ucimlrepo import fetch_ucirepo
 
@@ -5,6 +6,9 @@ def load_healthcare_data():
     """Load the original healthcare reviews data"""
     try:
         df = pd.read_csv('healthcare_reviews_processed.csv')
+        # Reviews folded in by incremental_training.py since the last full retrain
+        if os.path.exists('incremental_reviews.csv'):
+            df = pd.concat([df, pd.read_csv('incremental_reviews.csv')], ignore_index=True)
         return df
     except FileNotFoundError:
         print("Healthcare reviews data not found. Please run data_generation.py first.")
@@ -73,9 +77,10 @@ def load_drug_reviews_data():
 
 def combine_datasets():
     """Combine healthcare and drug reviews datasets"""
-    healthcare_df = load_healthcare_data()
-    drug_df = load_drug_reviews_data()
-    
+    return combine_frames(load_healthcare_data(), load_drug_reviews_data())
+
+def combine_frames(healthcare_df, drug_df):
+    """Combine already loaded healthcare and drug reviews (either may be None)"""
     if healthcare_df is not None and drug_df is not None:
         # Combine datasets
         combined_df = pd.concat([healthcare_df, drug_df], ignore_index=True)
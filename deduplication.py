@@ -0,0 +1,89 @@
+import re
+import zlib
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'\w+')
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def shingles(text, size=2):
+    """Word n-gram shingles of a lowercased text (the whole text when it is shorter than size)"""
+    words = TOKEN_PATTERN.findall(str(text).lower())
+    return {' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))} if words else set()
+
+
+def minhash_signatures(texts, num_perm=128, shingle_size=2, seed=42, block_shingles=1 << 15):
+    """MinHash signature rows (uint32) of texts; texts without words get an all-sentinel row"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)[:, None]
+    b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)[:, None]
+    signatures = np.full((len(texts), num_perm), MERSENNE_PRIME, dtype=np.uint32)
+
+    def hash_block(rows, hashes, lengths):
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        permuted = a * (np.asarray(hashes, dtype=np.uint64) % MERSENNE_PRIME)
+        permuted += b
+        permuted %= MERSENNE_PRIME
+        signatures[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T
+
+    # Documents are hashed in blocks of about block_shingles shingles, so the (num_perm x shingles)
+    # uint64 matrix stays near num_perm * block_shingles * 8 bytes (32 MB by default) however long the texts are
+    rows, hashes, lengths = [], [], []
+    for row, text in enumerate(texts):
+        text_shingles = shingles(text, shingle_size)
+        if not text_shingles:
+            continue
+        rows.append(row)
+        hashes.extend(zlib.crc32(s.encode('utf-8')) for s in text_shingles)
+        lengths.append(len(text_shingles))
+        if len(hashes) >= block_shingles:
+            hash_block(rows, hashes, lengths)
+            rows, hashes, lengths = [], [], []
+    if rows:
+        hash_block(rows, hashes, lengths)
+
+    return signatures
+
+
+def find_near_duplicates(texts, labels=None, threshold=0.5, num_perm=128, bands=32):
+    """Index of the first near-copy of every text (itself when it has none), found by MinHash LSH"""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(texts)
+    signatures = minhash_signatures(texts, num_perm)
+    has_words = signatures[:, 0] != MERSENNE_PRIME
+    rows_per_band = num_perm // bands
+    # Only rows with the same label may collapse, so negations never merge with their opposite
+    label_codes = np.unique(np.asarray(labels), return_inverse=True)[1].ravel() if labels is not None else np.zeros(n)
+    multipliers = np.random.default_rng(0).integers(1, 1 << 62, rows_per_band + 1, dtype=np.uint64) | np.uint64(1)
+
+    sources, targets = [], []
+    for band in range(bands):
+        # One 64-bit bucket key per row for this band (collisions are caught by the similarity check)
+        band_values = np.column_stack([signatures[:, band * rows_per_band:(band + 1) * rows_per_band], label_codes])
+        keys = (band_values.astype(np.uint64) * multipliers).sum(axis=1)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        leaders = first[inverse.ravel()]
+
+        # Each bucket member is compared with the bucket's first row on the full signature
+        candidates = np.nonzero((leaders != np.arange(n)) & has_words)[0]
+        similarity = (signatures[candidates] == signatures[leaders[candidates]]).mean(axis=1)
+        sources.append(candidates[similarity >= threshold])
+        targets.append(leaders[candidates[similarity >= threshold]])
+
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    graph = coo_matrix((np.ones(len(sources)), (sources, targets)), shape=(n, n))
+    _, components = connected_components(graph, directed=False)
+
+    # The lowest row index of each component represents it, so the first copy is kept
+    representatives = np.full(components.max() + 1 if n else 0, n, dtype=np.int64)
+    np.minimum.at(representatives, components, np.arange(n))
+    return representatives[components]
+
+
+def drop_near_duplicates(df, text_column, label_column=None, threshold=0.5):
+    """Rows of df with every cluster of near-duplicate texts collapsed to its first row"""
+    labels = df[label_column].to_numpy() if label_column is not None else None
+    representatives = find_near_duplicates(df[text_column].tolist(), labels, threshold)
+    return df[representatives == np.arange(len(df))]
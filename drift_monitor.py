@@ -0,0 +1,206 @@
+import json
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+CLASS_LABELS = ('negative', 'positive', 'neutral')
+BASELINE_FILE = 'drift_baseline.json'
+# Word-count bin edges of the length histogram; the last bin is open-ended
+LENGTH_EDGES = np.array([0, 3, 6, 11, 21, 41, 81, 161, 321])
+CONFIDENCE_BINS = 10
+# Conventional PSI alarm level, and the allowed rise in out-of-vocabulary rate
+PSI_THRESHOLD = 0.2
+OOV_THRESHOLD = 0.05
+# Readings over fewer texts than this are reported but not judged
+MIN_TEXTS = 200
+
+
+def unigram_tokenizer(vectorizer):
+    """(tokenize, stop words, unigram vocabulary) matching a fitted TfidfVectorizer or CompactVectorizer"""
+    pattern = vectorizer.token_pattern
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern)
+    if hasattr(vectorizer, 'get_stop_words'):
+        stop_words = frozenset(vectorizer.get_stop_words() or ())
+    else:
+        stop_words = vectorizer.stop_words
+    vocabulary = frozenset(term for term in vectorizer.vocabulary_ if ' ' not in term)
+    if vectorizer.lowercase:
+        return (lambda text: pattern.findall(text.lower())), stop_words, vocabulary
+    return pattern.findall, stop_words, vocabulary
+
+
+class Sketch:
+    """Fixed-size counters for one stretch of the input stream"""
+
+    def __init__(self):
+        self.texts = 0
+        self.terms = 0
+        self.oov_terms = 0
+        self.lengths = np.zeros(len(LENGTH_EDGES), dtype=np.int64)
+        self.classes = np.zeros(len(CLASS_LABELS), dtype=np.int64)
+        self.confidences = np.zeros(CONFIDENCE_BINS, dtype=np.int64)
+        self.confidence_sum = 0.0
+
+    def add(self, other):
+        self.texts += other.texts
+        self.terms += other.terms
+        self.oov_terms += other.oov_terms
+        self.lengths += other.lengths
+        self.classes += other.classes
+        self.confidences += other.confidences
+        self.confidence_sum += other.confidence_sum
+
+    def oov_rate(self):
+        return self.oov_terms / self.terms if self.terms else None
+
+    def to_dict(self):
+        return {
+            'texts': self.texts, 'terms': self.terms, 'oov_terms': self.oov_terms,
+            'lengths': self.lengths.tolist(), 'classes': self.classes.tolist(),
+            'confidences': self.confidences.tolist(), 'confidence_sum': self.confidence_sum,
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        sketch = cls()
+        sketch.texts, sketch.terms, sketch.oov_terms = values['texts'], values['terms'], values['oov_terms']
+        sketch.lengths += values['lengths']
+        sketch.classes += values['classes']
+        sketch.confidences += values['confidences']
+        sketch.confidence_sum = values['confidence_sum']
+        return sketch
+
+
+def population_stability_index(expected, actual, epsilon=1e-4):
+    """PSI between two histograms of counts over the same bins"""
+    expected = np.maximum(expected / max(expected.sum(), 1), epsilon)
+    actual = np.maximum(actual / max(actual.sum(), 1), epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class DriftMonitor:
+    """Streaming OOV rate, length, class and confidence histograms of served texts
+
+    Memory is constant: a lifetime sketch plus a current and a previous window of
+    window_size texts each, so "recent" always covers the last one to two windows.
+    """
+
+    def __init__(self, vectorizer=None, baseline=None, window_size=10000):
+        self.tokenizer = unigram_tokenizer(vectorizer) if vectorizer is not None else None
+        self.baseline = baseline
+        self.window_size = window_size
+        self.started_at = datetime.now().isoformat()
+        self.lifetime = Sketch()
+        self.current = Sketch()
+        self.previous = None
+        self._lock = threading.Lock()
+
+    def sketch(self, texts, codes, confidences):
+        """Sketch of one request or batch, built outside the lock"""
+        sketch = Sketch()
+        sketch.texts = len(texts)
+        n_words = np.empty(len(texts), dtype=np.int64)
+        if self.tokenizer is not None:
+            tokenize, stop_words, vocabulary = self.tokenizer
+            tokens = []
+            for i, text in enumerate(texts):
+                words = tokenize(text)
+                n_words[i] = len(words)
+                tokens.extend(words)
+            # Vocabulary lookups once per distinct token rather than per occurrence
+            for term, count in Counter(tokens).items():
+                if term not in stop_words:
+                    sketch.terms += count
+                    sketch.oov_terms += count if term not in vocabulary else 0
+        else:
+            n_words[:] = [len(text.split()) for text in texts]
+
+        sketch.lengths += np.bincount(np.searchsorted(LENGTH_EDGES, n_words, side='right') - 1,
+                                      minlength=len(LENGTH_EDGES))
+        sketch.classes += np.bincount(np.asarray(codes, dtype=np.int64), minlength=len(CLASS_LABELS))
+        confidences = np.asarray(confidences, dtype=np.float64)
+        bins = np.clip((confidences * CONFIDENCE_BINS).astype(np.int64), 0, CONFIDENCE_BINS - 1)
+        sketch.confidences += np.bincount(bins, minlength=CONFIDENCE_BINS)
+        sketch.confidence_sum = float(confidences.sum())
+        return sketch
+
+    def update(self, texts, codes, confidences):
+        if not len(texts):
+            return
+        sketch = self.sketch(texts, codes, confidences)
+        with self._lock:
+            self.lifetime.add(sketch)
+            self.current.add(sketch)
+            if self.current.texts >= self.window_size:
+                self.previous, self.current = self.current, Sketch()
+
+    def report(self):
+        """Lifetime and recent readings, with the recent ones compared against the baseline"""
+        with self._lock:
+            lifetime = Sketch.from_dict(self.lifetime.to_dict())
+            recent = Sketch.from_dict(self.current.to_dict())
+            if self.previous is not None:
+                recent.add(self.previous)
+        return {
+            'started_at': self.started_at,
+            'window_size': self.window_size,
+            'lifetime': describe_sketch(lifetime),
+            'recent': describe_sketch(recent),
+            'baseline': describe_sketch(self.baseline) if self.baseline is not None else None,
+            'comparison': compare_sketches(self.baseline, recent) if self.baseline is not None else None,
+        }
+
+
+def describe_sketch(sketch):
+    """Readable shares and rates of a sketch"""
+    texts = max(sketch.texts, 1)
+    oov_rate = sketch.oov_rate()
+    return {
+        'texts': sketch.texts,
+        'oov_rate': round(oov_rate, 4) if oov_rate is not None else None,
+        'length_edges': LENGTH_EDGES.tolist(),
+        'length_shares': np.round(sketch.lengths / texts, 4).tolist(),
+        'class_shares': dict(zip(CLASS_LABELS, np.round(sketch.classes / texts, 4).tolist())),
+        'confidence_shares': np.round(sketch.confidences / texts, 4).tolist(),
+        'mean_confidence': round(sketch.confidence_sum / texts, 4),
+    }
+
+
+def compare_sketches(baseline, recent):
+    """PSI per histogram and OOV rise of recent against baseline, and which of them drifted"""
+    if recent.texts < MIN_TEXTS:
+        return {'status': 'insufficient_data', 'min_texts': MIN_TEXTS}
+
+    comparison = {
+        'length_psi': population_stability_index(baseline.lengths, recent.lengths),
+        'class_psi': population_stability_index(baseline.classes, recent.classes),
+        'confidence_psi': population_stability_index(baseline.confidences, recent.confidences),
+    }
+    drifted = [name for name, value in comparison.items() if value > PSI_THRESHOLD]
+    if baseline.oov_rate() is not None and recent.oov_rate() is not None:
+        comparison['oov_rise'] = recent.oov_rate() - baseline.oov_rate()
+        if comparison['oov_rise'] > OOV_THRESHOLD:
+            drifted.append('oov_rise')
+
+    comparison = {name: round(value, 4) for name, value in comparison.items()}
+    comparison['status'] = 'drift' if drifted else 'ok'
+    comparison['drifted'] = drifted
+    return comparison
+
+
+def save_baseline(path, sketch, source):
+    with open(path, 'w') as f:
+        json.dump({'created_at': datetime.now().isoformat(), 'source': source, 'sketch': sketch.to_dict()}, f)
+
+
+def load_baseline(path):
+    """Baseline sketch saved at training time, or None if there is none"""
+    try:
+        with open(path) as f:
+            return Sketch.from_dict(json.load(f)['sketch'])
+    except (OSError, ValueError, KeyError):
+        return None
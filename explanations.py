@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def build_contribution_table(model):
+    """(n_features, n_classes) float32 per-term evidence for each class, or None for non-NB models"""
+    if not hasattr(model, 'feature_log_prob_'):
+        return None
+    log_prob = np.asarray(model.feature_log_prob_, dtype=np.float64)
+    # Centering across classes keeps only how much a term favours a class over the others
+    return np.ascontiguousarray((log_prob - log_prob.mean(axis=0)).T, dtype=np.float32)
+
+
+def feature_terms(vectorizer):
+    """Vocabulary terms ordered by feature index"""
+    terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+    terms[list(vectorizer.vocabulary_.values())] = list(vectorizer.vocabulary_.keys())
+    return terms
+
+
+def explain_row(row, table, terms, labels, top_k=5):
+    """Top contributing terms per class for one vectorized row (scipy CSR or SparseRows)"""
+    # Each stored TF-IDF value times its table row: the per-term part of the NB score
+    contributions = table[row.indices] * row.data[:, None]
+    explanation = {}
+    for k, label in enumerate(labels):
+        order = np.argsort(-contributions[:, k], kind='stable')[:top_k]
+        explanation[label] = [
+            {"term": terms[row.indices[i]], "weight": round(float(contributions[i, k]), 4)}
+            for i in order if contributions[i, k] > 0
+        ]
+    return explanation
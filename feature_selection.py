@@ -0,0 +1,51 @@
+import copy
+import numpy as np
+from forest_compaction import CompactForest
+
+
+def rank_features(X, y):
+    """Feature indices ordered from most to least informative by the chi-squared statistic"""
+    from sklearn.feature_selection import chi2
+
+    scores, _ = chi2(X, y)
+    return np.argsort(-np.nan_to_num(scores), kind='stable')
+
+
+def prune_vectorizer(vectorizer, keep):
+    """Copy of a fitted TfidfVectorizer restricted to the kept feature indices"""
+    from sklearn.base import clone
+
+    keep = np.sort(keep)
+    terms = vectorizer.get_feature_names_out()[keep]
+
+    # A fixed vocabulary plus the public idf_ setter gives a fitted vectorizer without refitting
+    pruned = clone(vectorizer).set_params(vocabulary={term: index for index, term in enumerate(terms)})
+    pruned.idf_ = vectorizer.idf_[keep]
+    return pruned
+
+
+def prune_model(model, keep):
+    """Copy of a fitted NB model or CompactForest restricted to the kept feature indices"""
+    keep = np.sort(keep)
+    pruned = copy.deepcopy(model)
+
+    if isinstance(model, CompactForest):
+        # Splits on dropped terms now always see a zero, like any out-of-vocabulary word
+        pruned.column_map = model.column_map[keep]
+    elif hasattr(model, 'feature_log_prob_'):
+        pruned.feature_count_ = model.feature_count_[:, keep]
+        pruned.feature_log_prob_ = model.feature_log_prob_[:, keep]
+        if hasattr(model, 'feature_all_'):
+            pruned.feature_all_ = model.feature_all_[keep]
+    else:
+        raise TypeError(f"Cannot prune features of {type(model).__name__}")
+
+    pruned.n_features_in_ = len(keep)
+    return pruned
+
+
+def select_feature_count(results, tolerance=0.005):
+    """Smallest feature count whose accuracy is within tolerance of the full vocabulary"""
+    full_accuracy = max(results, key=lambda r: r['n_features'])['accuracy']
+    candidates = [r for r in results if r['accuracy'] >= full_accuracy - tolerance]
+    return min(candidates, key=lambda r: r['n_features'])['n_features']
@@ -0,0 +1,88 @@
+import numpy as np
+
+
+class CompactForest:
+    """RandomForestClassifier flattened into NumPy node arrays with vectorized batch traversal"""
+
+    def __init__(self, forest):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+
+        # Keep only the vocabulary columns some split actually tests
+        used = np.unique(np.concatenate([tree.feature[tree.feature >= 0] for tree in trees]))
+        self.column_map = np.full(forest.n_features_in_, -1, dtype=np.int32)
+        self.column_map[used] = np.arange(len(used), dtype=np.int32)
+        self.n_used_features = max(len(used), 1)
+
+        feature, threshold, left, right, leaf_slot, values, roots = [], [], [], [], [], [], []
+        node_offset = leaf_offset = 0
+        for tree in trees:
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point back at themselves so every row can take max_depth steps
+            left.append(np.where(is_leaf, nodes, tree.children_left) + node_offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + node_offset)
+            feature.append(np.where(is_leaf, 0, self.column_map[np.maximum(tree.feature, 0)]))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+
+            # Class distributions are stored for leaves only, normalised like DecisionTreeClassifier
+            slots = np.full(tree.node_count, -1)
+            slots[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+            leaf_slot.append(slots)
+            leaf_values = tree.value[is_leaf, 0, :]
+            values.append(leaf_values / leaf_values.sum(axis=1, keepdims=True))
+
+            roots.append(node_offset)
+            node_offset += tree.node_count
+            leaf_offset += is_leaf.sum()
+
+        self.feature = np.concatenate(feature).astype(np.int32)
+        self.threshold = np.concatenate(threshold).astype(np.float64)
+        # children[2 * node] is the left child and children[2 * node + 1] the right one
+        self.children = np.stack([np.concatenate(left), np.concatenate(right)], axis=1).ravel().astype(np.int32)
+        self.leaf_slot = np.concatenate(leaf_slot).astype(np.int32)
+        self.values = np.concatenate(values).astype(np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _densify(self, X):
+        """Scatter the used columns of a CSR chunk into a small dense float32 block"""
+        dense = np.zeros((X.shape[0], self.n_used_features), dtype=np.float32)
+        columns = self.column_map[X.indices]
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        kept = columns >= 0
+        dense[rows[kept], columns[kept]] = X.data[kept]
+        return dense
+
+    def _predict_chunk(self, X):
+        dense = self._densify(X)
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        node = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int32) * dense.shape[1], n_trees)
+        values = dense.ravel()
+
+        # Advance every (row, tree) pair one level per step; pairs on a leaf stay put
+        for _ in range(self.max_depth):
+            go_right = values.take(row_offset + self.feature.take(node)) > self.threshold.take(node)
+            node = self.children.take(2 * node + go_right)
+
+        leaf_values = self.values.take(self.leaf_slot.take(node), axis=0)
+        return leaf_values.reshape(n_rows, n_trees, -1).mean(axis=1)
+
+    def predict_proba(self, X, chunk_size=256):
+        """Class probabilities averaged over trees, matching RandomForestClassifier.predict_proba"""
+        X = X.tocsr()
+        probabilities = np.empty((X.shape[0], len(self.classes_)))
+        for start in range(0, X.shape[0], chunk_size):
+            probabilities[start:start + chunk_size] = self._predict_chunk(X[start:start + chunk_size])
+        return probabilities
+
+    def predict(self, X):
+        """Predict class labels for X"""
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,118 @@
+import math
+import threading
+import time
+
+# Weight of the newest request in the moving average of service time used for Retry-After
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class AdmissionPool:
+    """Caps the concurrent requests of one traffic class in a worker process
+
+    Up to max_active requests run at once; up to max_queued more wait (in
+    arrival order) at most queue_timeout seconds for a slot. Anything beyond
+    that is shed immediately, so a burst of one class never holds every server
+    thread and requests of the other classes keep their latency. Background
+    work (batch job chunks) waits for a slot with no limit or timeout, but only
+    takes one when no request is waiting.
+    """
+
+    def __init__(self, name, max_active, max_queued, queue_timeout):
+        self.name = name
+        self.max_active = max(max_active, 1)
+        self.max_queued = max(max_queued, 0)
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.peak_queued = 0
+        self.service_time = None
+        self.background_waiting = 0
+        self.background_admitted = 0
+        self._waiting = []
+        self._condition = threading.Condition()
+
+    @property
+    def queued(self):
+        return len(self._waiting)
+
+    def acquire(self):
+        """Take a slot, waiting in the queue if needed; False when the request should be shed"""
+        with self._condition:
+            if self.active < self.max_active and not self._waiting:
+                self.active += 1
+                self.admitted += 1
+                return True
+            if len(self._waiting) >= self.max_queued:
+                self.rejected += 1
+                return False
+
+            ticket = object()
+            self._waiting.append(ticket)
+            self.peak_queued = max(self.peak_queued, len(self._waiting))
+            deadline = time.monotonic() + self.queue_timeout
+            # Only the head of the queue may take a freed slot, so waiters are served in order
+            while self.active >= self.max_active or self._waiting[0] is not ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self.timed_out += 1
+                    self._condition.notify_all()
+                    return False
+                self._condition.wait(remaining)
+            self._waiting.pop(0)
+            self.active += 1
+            self.admitted += 1
+            self._condition.notify_all()
+            return True
+
+    def acquire_background(self):
+        """Block until a slot is free and no request is queued for it, then take it"""
+        with self._condition:
+            self.background_waiting += 1
+            while self.active >= self.max_active or self._waiting:
+                self._condition.wait()
+            self.background_waiting -= 1
+            self.active += 1
+            self.background_admitted += 1
+
+    def release(self, elapsed):
+        """Free a slot taken by acquire; elapsed (seconds) feeds the Retry-After estimate"""
+        with self._condition:
+            self.active -= 1
+            if self.service_time is None:
+                self.service_time = elapsed
+            else:
+                self.service_time += SERVICE_TIME_SMOOTHING * (elapsed - self.service_time)
+            self._condition.notify_all()
+
+    def release_background(self):
+        """Free a slot taken by acquire_background, leaving the requests' Retry-After estimate alone"""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def retry_after(self):
+        """Whole seconds until the current queue is expected to drain (at least 1)"""
+        with self._condition:
+            backlog = (len(self._waiting) + self.active) / self.max_active
+            return max(1, math.ceil(backlog * (self.service_time or 1.0)))
+
+    def stats(self):
+        """Limits, current queue depth and lifetime counters"""
+        with self._condition:
+            return {
+                "max_active": self.max_active,
+                "max_queued": self.max_queued,
+                "queue_timeout": self.queue_timeout,
+                "active": self.active,
+                "queued": len(self._waiting),
+                "peak_queued": self.peak_queued,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "background_waiting": self.background_waiting,
+                "background_admitted": self.background_admitted,
+                "service_time_ms": round(self.service_time * 1000, 1) if self.service_time is not None else None
+            }
@@ -0,0 +1,335 @@
+import csv
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from results_store import describe_rows
+
+TEXT_COLUMNS = ['text', 'review', 'comment', 'feedback', 'processed_review']
+# Optional columns that label stored results for the facility/provider/week rollups
+METADATA_COLUMNS = {
+    'facility': ['facility', 'hospital', 'clinic', 'location'],
+    'provider': ['provider', 'doctor', 'physician'],
+    'date': ['date', 'review_date', 'visit_date', 'created_at'],
+}
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+FINISHED_STATES = ('completed', 'failed', 'cancelled')
+
+
+def find_text_column(columns):
+    """First supported review column in a CSV header, or None"""
+    for column in TEXT_COLUMNS:
+        if column in columns:
+            return column
+    return None
+
+
+def find_metadata_columns(columns):
+    """CSV column used for each metadata field present in a header"""
+    found = {}
+    for field, candidates in METADATA_COLUMNS.items():
+        column = next((c for c in candidates if c in columns), None)
+        if column is not None:
+            found[field] = column
+    return found
+
+
+def extract_texts(column):
+    """Row IDs (1-based) and stripped texts of a pandas column, skipping blanks and NaN"""
+    # pandas' string dtype keeps missing values through astype(str), older object columns turn them into 'nan'
+    texts = column.astype(str).str.strip()
+    kept = (texts.notna() & (texts != '') & (texts != 'nan')).to_numpy()
+    return (column.index.to_numpy()[kept] + 1).astype(np.int64), texts[kept].tolist()
+
+
+class MemoryQueue:
+    """In-process FIFO of job IDs; jobs run in the process that accepted them"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, job_id):
+        self._queue.put(job_id)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def get(self, timeout=1.0):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class DirectoryQueue:
+    """Spool-directory FIFO shared by every worker process on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def put(self, job_id):
+        name = f"{time.time_ns():020d}-{job_id}"
+        with open(os.path.join(self.path, name + '.tmp'), 'w'):
+            pass
+        os.replace(os.path.join(self.path, name + '.tmp'), os.path.join(self.path, name))
+
+    def pending(self):
+        return sum(1 for n in os.listdir(self.path) if not n.endswith('.tmp'))
+
+    def get(self, timeout=1.0):
+        deadline = time.time() + timeout
+        while True:
+            for name in sorted(n for n in os.listdir(self.path) if not n.endswith('.tmp')):
+                try:
+                    # Only one process wins the unlink, so only one process runs the job
+                    os.unlink(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    continue
+                return name.split('-', 1)[1]
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.1)
+
+
+class JobManager:
+    """Disk-backed batch jobs scored by a lazily started in-process worker pool"""
+
+    def __init__(self, jobs_dir, predict, job_queue=None, workers=2, chunk_rows=1000, results_store=None,
+                 max_rows=None, ttl_seconds=None, sweep_interval=600, admission=None):
+        self.jobs_dir = jobs_dir
+        self.predict = predict
+        self.results_store = results_store
+        self.queue = job_queue if job_queue is not None else MemoryQueue()
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.max_rows = max_rows
+        # Optional AdmissionPool each chunk is scored in, so jobs share the batch request slots
+        self.admission = admission
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._threads = []
+        self._lock = threading.Lock()
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _job_dir(self, job_id):
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _write_status(self, job_id, status):
+        status['updated_at'] = datetime.now().isoformat()
+        path = os.path.join(self._job_dir(job_id), 'status.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(status, f)
+        os.replace(path + '.tmp', path)
+
+    def _ensure_workers(self):
+        # Started on first use rather than at import so pre-forked servers get
+        # threads in each worker process, not in the master
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker_loop, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, file):
+        """Store an uploaded CSV and queue it; returns (job_id, error)"""
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+        input_path = os.path.join(job_dir, 'input.csv')
+        file.save(input_path)
+
+        with open(input_path, newline='', encoding='utf-8', errors='replace') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            total = sum(1 for row in reader if row)
+        text_column = find_text_column(header)
+        if text_column is None:
+            shutil.rmtree(job_dir)
+            return None, "CSV must contain a 'text', 'review', 'comment', 'feedback', or 'processed_review' column"
+        if self.max_rows is not None and total > self.max_rows:
+            shutil.rmtree(job_dir)
+            return None, f"CSV has {total} rows; batch jobs accept at most {self.max_rows}"
+
+        self._write_status(job_id, {
+            "job_id": job_id,
+            "state": "queued",
+            "filename": file.filename,
+            "text_column": text_column,
+            "metadata_columns": find_metadata_columns(header),
+            "total_rows": total,
+            "processed_rows": 0,
+            "chunks": [],
+            "summary": {"total": 0, "positive": 0, "negative": 0, "neutral": 0},
+            "created_at": datetime.now().isoformat(),
+            "error": None
+        })
+        self._ensure_workers()
+        self.queue.put(job_id)
+        return job_id, None
+
+    def pending(self):
+        """Jobs queued and not yet picked up by a worker"""
+        return self.queue.pending()
+
+    def status(self, job_id):
+        """Current status dict for a job, or None if it does not exist"""
+        job_dir = self._job_dir(job_id)
+        if job_dir is None or not os.path.exists(os.path.join(job_dir, 'status.json')):
+            return None
+        with open(os.path.join(job_dir, 'status.json')) as f:
+            status = json.load(f)
+        status['progress'] = status['processed_rows'] / status['total_rows'] if status['total_rows'] else 1.0
+        return status
+
+    def results(self, job_id, offset=0, limit=None):
+        """Results written so far, sliced by offset/limit without reading skipped chunks"""
+        status = self.status(job_id)
+        if status is None:
+            return None
+
+        rows = []
+        chunk_start = 0
+        for chunk_number, chunk_size in enumerate(status['chunks']):
+            chunk_end = chunk_start + chunk_size
+            if chunk_end > offset and (limit is None or len(rows) < limit):
+                with open(os.path.join(self._job_dir(job_id), f'chunk-{chunk_number:05d}.json')) as f:
+                    chunk = json.load(f)
+                rows.extend(chunk[max(offset - chunk_start, 0):])
+            chunk_start = chunk_end
+        if limit is not None:
+            rows = rows[:limit]
+
+        return {
+            "job_id": job_id,
+            "state": status['state'],
+            "complete": status['state'] == 'completed',
+            "offset": offset,
+            "available": chunk_start,
+            "results": rows,
+            "summary": status['summary'],
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def cancel(self, job_id):
+        """Flag a job for cancellation; running jobs stop before their next chunk"""
+        status = self.status(job_id)
+        if status is None:
+            return None
+        if status['state'] not in FINISHED_STATES:
+            open(os.path.join(self._job_dir(job_id), 'cancel'), 'w').close()
+            status['cancel_requested'] = True
+        return status
+
+    def delete(self, job_id):
+        """Remove a finished job's files; None if it does not exist, False while it is queued or running"""
+        status = self.status(job_id)
+        if status is None:
+            return None
+        if status['state'] not in FINISHED_STATES:
+            return False
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        return True
+
+    def sweep(self, now=None):
+        """Remove finished jobs (and abandoned uploads) untouched for ttl_seconds; returns how many"""
+        if self.ttl_seconds is None:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.ttl_seconds
+        removed = 0
+        for job_id in os.listdir(self.jobs_dir):
+            job_dir = self._job_dir(job_id)
+            if job_dir is None or not os.path.isdir(job_dir):
+                continue
+            status_path = os.path.join(job_dir, 'status.json')
+            try:
+                if os.path.getmtime(status_path if os.path.exists(status_path) else job_dir) > cutoff:
+                    continue
+                if os.path.exists(status_path):
+                    with open(status_path) as f:
+                        if json.load(f)['state'] not in FINISHED_STATES:
+                            continue
+            except (OSError, ValueError, KeyError):
+                continue
+            # Several workers (or processes sharing jobs_dir) may sweep the same job
+            shutil.rmtree(job_dir, ignore_errors=True)
+            removed += 1
+        return removed
+
+    def _worker_loop(self):
+        while True:
+            job_id = self.queue.get()
+            if job_id is not None:
+                self._run(job_id)
+            if time.time() - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = time.time()
+                self.sweep()
+
+    def _run(self, job_id):
+        import pandas as pd
+
+        job_dir = self._job_dir(job_id)
+        status = self.status(job_id)
+        if status is None or status['state'] != 'queued':
+            return
+        status.pop('progress')
+
+        try:
+            status['state'] = 'running'
+            self._write_status(job_id, status)
+
+            metadata_columns = status.get('metadata_columns', {})
+            usecols = [status['text_column']] + [c for c in metadata_columns.values() if c != status['text_column']]
+            chunks = pd.read_csv(os.path.join(job_dir, 'input.csv'), usecols=usecols, chunksize=self.chunk_rows)
+            cancel_path = os.path.join(job_dir, 'cancel')
+            for chunk in chunks:
+                if os.path.exists(cancel_path):
+                    status['state'] = 'cancelled'
+                    break
+
+                ids, texts = extract_texts(chunk[status['text_column']])
+                if self.admission is not None:
+                    self.admission.acquire_background()
+                try:
+                    sentiments, confidences, stages = self.predict(texts)
+                finally:
+                    if self.admission is not None:
+                        self.admission.release_background()
+                results = [
+                    {"id": row_id, "text": text, "sentiment": sentiment,
+                     "confidence": round(confidence, 3), "stage": stage}
+                    for row_id, text, sentiment, confidence, stage in zip(ids.tolist(), texts, sentiments, confidences, stages)
+                ]
+                with open(os.path.join(job_dir, f"chunk-{len(status['chunks']):05d}.json"), 'w') as f:
+                    json.dump(results, f)
+                if self.results_store is not None:
+                    facilities, providers, weeks = describe_rows(chunk.loc[ids - 1], metadata_columns, status['created_at'])
+                    self.results_store.append(job_id, ids.tolist(), facilities, providers, weeks, sentiments, confidences)
+
+                status['chunks'].append(len(results))
+                status['processed_rows'] += len(chunk)
+                status['summary']['total'] += len(results)
+                for sentiment in sentiments:
+                    status['summary'][sentiment] += 1
+                self._write_status(job_id, status)
+            else:
+                # The cancel may have come during the last chunk, or the CSV may have had no rows
+                status['state'] = 'cancelled' if os.path.exists(cancel_path) else 'completed'
+        except Exception as e:
+            print(f"Batch job {job_id} failed: {e}")
+            status['state'] = 'failed'
+            status['error'] = str(e)
+
+        self._write_status(job_id, status)
@@ -1,21 +1,92 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import pickle
-import pandas as pd
+from werkzeug.exceptions import RequestEntityTooLarge
 import numpy as np
-import io
+import functools
 import json
-import joblib
 import os
+import struct
+import tempfile
+import time
 from datetime import datetime
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Trained artifacts and shared helper modules live at the repository root
+# (serving_model puts it on sys.path). pandas, joblib and scikit-learn are
+# imported lazily so a cold start that finds the compact artifact never pays for them.
+from serving_model import ROOT_DIR, MODEL_DIR, INFERENCE_MODE, load_artifacts, score_texts
+from batch_jobs import JobManager, MemoryQueue, DirectoryQueue, find_text_column, extract_texts
+from results_store import ResultsStore, DIMENSIONS
+from parallel_scoring import ParallelScorer
+from aspects import ASPECTS, find_aspect_windows, group_aspects
+from explanations import build_contribution_table, feature_terms, explain_row
+from drift_monitor import DriftMonitor, load_baseline, BASELINE_FILE
+from short_text import load_lookup, LOOKUP_FILE
+from admission import AdmissionPool
 
 app = Flask(__name__)
 CORS(app)
 
+SENTIMENT_MAP = {0: 'negative', 1: 'positive', 2: 'neutral'}
+SENTIMENT_CODES = {sentiment: code for code, sentiment in SENTIMENT_MAP.items()}
+
+# Batches of at least PARALLEL_MIN_ROWS texts are sharded across SCORING_PROCESSES
+# worker processes (0 or 1 keeps scoring in the request process)
+SCORING_PROCESSES = int(os.environ.get('SENTIMENT_SCORING_PROCESSES', 0))
+PARALLEL_MIN_ROWS = int(os.environ.get('SENTIMENT_PARALLEL_MIN_ROWS', 2000))
+
+# Asynchronous batch jobs: results are written to disk so any worker can serve polls
+JOBS_DIR = os.environ.get('SENTIMENT_JOBS_DIR', os.path.join(tempfile.gettempdir(), 'sentiment_jobs'))
+JOB_QUEUE = os.environ.get('SENTIMENT_JOB_QUEUE', 'memory')  # 'memory' or 'directory'
+JOB_WORKERS = int(os.environ.get('SENTIMENT_JOB_WORKERS', 2))
+JOB_CHUNK_ROWS = int(os.environ.get('SENTIMENT_JOB_CHUNK_ROWS', 1000))
+# Finished jobs' files are removed this long after their last update (0 keeps them until deleted)
+JOB_TTL_HOURS = float(os.environ.get('SENTIMENT_JOB_TTL_HOURS', 24))
+# Local SQLite file that batch jobs append scored rows and weekly rollups to
+RESULTS_DB = os.environ.get('SENTIMENT_RESULTS_DB', os.path.join(ROOT_DIR, 'sentiment_results.sqlite3'))
+
+# Admission control, per worker process: interactive (/api/analyze) and batch (/api/analyze-batch and
+# /api/jobs uploads) requests get separate slot pools with bounded wait queues, so batch uploads can
+# never hold every server thread; requests past a full queue or its timeout get 429 with Retry-After
+INTERACTIVE_CONCURRENCY = int(os.environ.get('SENTIMENT_INTERACTIVE_CONCURRENCY', 4))
+INTERACTIVE_QUEUE = int(os.environ.get('SENTIMENT_INTERACTIVE_QUEUE', 32))
+INTERACTIVE_QUEUE_TIMEOUT = float(os.environ.get('SENTIMENT_INTERACTIVE_QUEUE_TIMEOUT', 2))
+BATCH_CONCURRENCY = int(os.environ.get('SENTIMENT_BATCH_CONCURRENCY', 1))
+BATCH_QUEUE = int(os.environ.get('SENTIMENT_BATCH_QUEUE', 1))
+BATCH_QUEUE_TIMEOUT = float(os.environ.get('SENTIMENT_BATCH_QUEUE_TIMEOUT', 10))
+# Upload size (413 past it), rows per synchronous batch and per job, and jobs waiting for a job worker
+MAX_UPLOAD_MB = float(os.environ.get('SENTIMENT_MAX_UPLOAD_MB', 50))
+MAX_BATCH_ROWS = int(os.environ.get('SENTIMENT_MAX_BATCH_ROWS', 10000))
+MAX_JOB_ROWS = int(os.environ.get('SENTIMENT_MAX_JOB_ROWS', 1000000))
+MAX_PENDING_JOBS = int(os.environ.get('SENTIMENT_MAX_PENDING_JOBS', 100))
+JOB_RETRY_AFTER = 30  # seconds suggested to clients turned away by a full job queue
+app.config['MAX_CONTENT_LENGTH'] = int(MAX_UPLOAD_MB * 1024 * 1024)
+interactive_pool = AdmissionPool('interactive', INTERACTIVE_CONCURRENCY, INTERACTIVE_QUEUE, INTERACTIVE_QUEUE_TIMEOUT)
+batch_pool = AdmissionPool('batch', BATCH_CONCURRENCY, BATCH_QUEUE, BATCH_QUEUE_TIMEOUT)
+
+# Number of contributing terms listed per class by explain requests
+EXPLAIN_TOP_TERMS = int(os.environ.get('SENTIMENT_EXPLAIN_TOP_TERMS', 5))
+
+# Very short texts covered by the training-time lookup table skip the model ('0' disables)
+SHORT_TEXT_LOOKUP = os.environ.get('SENTIMENT_SHORT_TEXT_LOOKUP', '1') != '0'
+
+# Served texts per drift monitor window; recent readings cover the last one to two windows
+DRIFT_WINDOW = int(os.environ.get('SENTIMENT_DRIFT_WINDOW', 10000))
+
 # Global variables to store loaded models
 model = None
 vectorizer = None
+calibration = None
+cascade = None
+short_text_lookup = None
+# NB contribution table, vocabulary terms and class labels for explain requests
+contribution_table = None
+explain_terms = None
+explain_labels = None
 model_metrics = {
     "accuracy": 0.8210,  # Updated from enhanced model
     "precision": 0.79,   # Updated weighted average
@@ -29,45 +100,105 @@ model_metrics = {
 
 def load_models():
     """Load the trained model and vectorizer"""
-    global model, vectorizer
+    global model, vectorizer, calibration, cascade
     try:
-        # Load the actual trained model and vectorizer
-        model_path = os.path.join(os.path.dirname(__file__), '..', '..', 'sentiment_model.pkl')
-        vectorizer_path = os.path.join(os.path.dirname(__file__), '..', '..', 'tfidf_vectorizer.pkl')
-        
-        if os.path.exists(model_path) and os.path.exists(vectorizer_path):
-            model = joblib.load(model_path)
-            vectorizer = joblib.load(vectorizer_path)
-            print("Models loaded successfully from trained files")
-            return True
-        else:
+        artifacts = load_artifacts()
+        if artifacts is None:
             print("Model files not found, using simulated model")
             return False
+        vectorizer, model, calibration, cascade = artifacts
+        return True
     except Exception as e:
         print(f"Error loading models: {e}")
         return False
 
-def predict_sentiment(text):
-    """Predict sentiment for a single text using the actual trained model"""
+def load_explainer():
+    """Precompute the per-term contribution table of the serving NB model"""
+    global contribution_table, explain_terms, explain_labels
+    # In cascade mode the fast NB stage is explained; a RandomForest model has no table
+    nb_model = cascade['fast_model'] if cascade is not None else model
+    table = build_contribution_table(nb_model) if nb_model is not None else None
+    if table is None or vectorizer is None:
+        return False
+    contribution_table = table
+    explain_terms = feature_terms(vectorizer)
+    explain_labels = [SENTIMENT_MAP[label] for label in nb_model.classes_.tolist()]
+    return True
+
+def explain_features(X):
+    """Top contributing n-grams per class for the first row of vectorized texts X"""
+    return explain_row(X[[0]], contribution_table, explain_terms, explain_labels, EXPLAIN_TOP_TERMS)
+
+def observe(texts, codes, confidences):
+    """Feed served reviews and their predictions to the drift monitor"""
+    try:
+        drift_monitor.update(texts, codes, confidences)
+    except Exception as e:
+        print(f"Drift monitor update failed: {e}")
+
+def predict_observed(texts):
+    """predict_sentiments for batch job chunks, observed by the drift monitor"""
+    sentiments, confidences, stages = predict_sentiments(texts)
+    observe(texts, [SENTIMENT_CODES[s] for s in sentiments], confidences)
+    return sentiments, confidences, stages
+
+def score_codes(texts, X=None):
+    """Score texts in this process into int8 label codes, confidences and answering stages"""
+    return score_texts(texts, vectorizer, model, calibration, cascade, X)
+
+def predict_codes(texts, X=None):
+    """Score texts into label codes, confidences and stages; covered short texts are looked up
+
+    X optionally holds the texts already vectorized (e.g. for an explanation) so they are not vectorized again.
+    """
+    if not texts:
+        return np.empty(0, dtype=np.int8), np.empty(0), np.empty(0, dtype=str)
+    rows = []
+    if short_text_lookup is not None:
+        rows, labels, lookup_confidences, lookup_stages = short_text_lookup.lookup_many(texts)
+    if not rows:
+        return model_codes(texts, X)
+    
+    codes = np.empty(len(texts), dtype=np.int8)
+    confidences = np.empty(len(texts))
+    stages = np.empty(len(texts), dtype=object)
+    codes[rows], confidences[rows], stages[rows] = labels, lookup_confidences, lookup_stages
+    remaining = np.ones(len(texts), dtype=bool)
+    remaining[rows] = False
+    if remaining.any():
+        rest = [text for text, keep in zip(texts, remaining) if keep]
+        X_rest = X[np.flatnonzero(remaining)] if X is not None else None
+        codes[remaining], confidences[remaining], stages[remaining] = model_codes(rest, X_rest)
+    return codes, confidences, stages.astype(str)
+
+def model_codes(texts, X=None):
+    """Score texts with the model(s) into label codes, confidences and stages, in parallel for large batches"""
     try:
         if model is not None and vectorizer is not None:
-            # Use the actual trained model
-            text_vectorized = vectorizer.transform([text])
-            prediction = model.predict(text_vectorized)[0]
-            probability = model.predict_proba(text_vectorized)[0]
-            
-            # Map prediction to sentiment
-            sentiment_map = {0: 'negative', 1: 'positive', 2: 'neutral'}
-            sentiment = sentiment_map[prediction]
-            confidence = max(probability) * 100
-            
-            return sentiment, confidence / 100  # Convert to 0-1 scale
-        else:
-            # Fallback to keyword-based simulation
-            return predict_sentiment_simulation(text)
+            if parallel_scorer is not None and X is None and len(texts) >= PARALLEL_MIN_ROWS:
+                try:
+                    return parallel_scorer.score(texts)
+                except Exception as e:
+                    print(f"Parallel scoring failed, scoring in-process: {e}")
+            return score_codes(texts, X)
     except Exception as e:
         print(f"Error in model prediction: {e}")
-        return predict_sentiment_simulation(text)
+    
+    # Fallback to keyword-based simulation
+    results = [predict_sentiment_simulation(text) for text in texts]
+    return (np.array([SENTIMENT_CODES[r[0]] for r in results], dtype=np.int8),
+            np.array([r[1] for r in results]),
+            np.full(len(texts), 'simulation'))
+
+def predict_sentiments(texts, X=None):
+    """Predict sentiment for a list of texts, returning sentiments, confidences and answering stages"""
+    codes, confidences, stages = predict_codes(texts, X)
+    return [SENTIMENT_MAP[code] for code in codes.tolist()], confidences.tolist(), stages.tolist()
+
+def predict_sentiment(text):
+    """Predict sentiment for a single text using the actual trained model"""
+    sentiments, confidences, _ = predict_sentiments([text])
+    return sentiments[0], confidences[0]
 
 def predict_sentiment_simulation(text):
     """Simulate sentiment prediction for demo purposes"""
@@ -104,6 +235,32 @@ def predict_sentiment_simulation(text):
     
     return sentiment, confidence
 
+def too_busy(message, retry_after):
+    """429 response asking the client to retry after retry_after seconds"""
+    response = jsonify({"error": message, "retry_after": retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def admitted(pool):
+    """Run a view in one of pool's slots, answering 429 when its queue is full or the wait times out"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not pool.acquire():
+                return too_busy(f"Too many concurrent {pool.name} requests, please retry", pool.retry_after())
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                pool.release(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    return jsonify({"error": f"Upload exceeds the {MAX_UPLOAD_MB:g} MB limit"}), 413
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -111,10 +268,16 @@ def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "models_loaded": model is not None and vectorizer is not None,
-        "model_type": "trained_model" if model is not None else "simulated_model"
+        "model_type": "trained_model" if model is not None else "simulated_model",
+        "calibrated": calibration is not None,
+        "inference_mode": "cascade" if cascade is not None else "model",
+        "explainable": contribution_table is not None,
+        "drift_baseline": drift_monitor.baseline is not None,
+        "short_text_lookup": short_text_lookup is not None
     })
 
 @app.route('/api/analyze', methods=['POST'])
+@admitted(interactive_pool)
 def analyze_single():
     """Analyze sentiment for a single text"""
     try:
@@ -127,77 +290,280 @@ def analyze_single():
         if not text:
             return jsonify({"error": "Text cannot be empty"}), 400
         
-        sentiment, confidence = predict_sentiment(text)
+        # Aspect windows are scored in the same model call as the review itself. An explanation
+        # reuses the review's TF-IDF row, so the texts are vectorized once and passed to the model
+        want_aspects = request_flag('aspects', data)
+        want_explanation = request_flag('explain', data)
+        rows, aspects, windows, mentions = find_aspect_windows([text]) if want_aspects else ([], [], [], [])
+        X = vectorizer.transform([text] + windows) if want_explanation and contribution_table is not None else None
+        sentiments, confidences, stages = predict_sentiments([text] + windows, X)
+        observe([text], [SENTIMENT_CODES[sentiments[0]]], confidences[:1])
         
-        return jsonify({
+        result = {
             "text": text,
-            "sentiment": sentiment,
-            "confidence": round(confidence, 3),
+            "sentiment": sentiments[0],
+            "confidence": round(confidences[0], 3),
+            "stage": stages[0],
             "timestamp": datetime.now().isoformat(),
             "model_used": "trained_model" if model is not None else "simulated_model"
-        })
+        }
+        if want_aspects:
+            result["aspects"] = group_aspects(1, rows, aspects, mentions, sentiments[1:], confidences[1:])[0]
+        if want_explanation:
+            # None without an NB model to explain
+            result["explanation"] = explain_features(X) if X is not None else None
+        return jsonify(result)
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def request_flag(name, data=None):
+    """Whether an opt-in option is set (?name=true, form field or JSON flag)"""
+    flag = request.args.get(name) or request.form.get(name) or (data or {}).get(name)
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def get_uploaded_csv():
+    """Return the uploaded CSV file and an error message (one of them is None)"""
+    if 'file' not in request.files:
+        return None, "No file uploaded"
+    
+    file = request.files['file']
+    if file.filename == '':
+        return None, "No file selected"
+    
+    if not file.filename.endswith('.csv'):
+        return None, "Only CSV files are supported"
+    
+    return file, None
+
 @app.route('/api/analyze-batch', methods=['POST'])
+@admitted(batch_pool)
 def analyze_batch():
     """Analyze sentiment for batch of texts"""
+    # Outside the try so an oversized upload reaches the 413 handler
+    file, error = get_uploaded_csv()
     try:
-        if 'file' not in request.files:
-            return jsonify({"error": "No file uploaded"}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"error": "No file selected"}), 400
-        
-        if not file.filename.endswith('.csv'):
-            return jsonify({"error": "Only CSV files are supported"}), 400
+        if error:
+            return jsonify({"error": error}), 400
         
-        # Read CSV file
-        df = pd.read_csv(file)
+        # Read CSV file (pandas is only needed for uploads, so it is imported here);
+        # one row past the limit is enough to reject it without parsing the rest
+        import pandas as pd
+        df = pd.read_csv(file, nrows=MAX_BATCH_ROWS + 1)
+        if len(df) > MAX_BATCH_ROWS:
+            return jsonify({"error": f"CSV has more than {MAX_BATCH_ROWS} rows; submit it to /api/jobs instead"}), 400
         
         # Check if required column exists
-        text_column = None
-        for col in ['text', 'review', 'comment', 'feedback', 'processed_review']:
-            if col in df.columns:
-                text_column = col
-                break
+        text_column = find_text_column(df.columns)
         
         if text_column is None:
             return jsonify({"error": "CSV must contain a 'text', 'review', 'comment', 'feedback', or 'processed_review' column"}), 400
         
-        results = []
-        for idx, row in df.iterrows():
-            text = str(row[text_column]).strip()
-            if text and text != 'nan' and len(text) > 0:
-                sentiment, confidence = predict_sentiment(text)
-                results.append({
-                    "id": idx + 1,
-                    "text": text,
-                    "sentiment": sentiment,
-                    "confidence": round(confidence, 3)
-                })
+        ids, texts = extract_texts(df[text_column])
+        
+        response_format = request.args.get('format', 'rows')
+        want_aspects = request_flag('aspects')
+        if want_aspects and response_format == 'binary':
+            return jsonify({"error": "Aspects are not available in the binary format"}), 400
+        rows, aspects, windows, mentions = find_aspect_windows(texts) if want_aspects else ([], [], [], [])
+        
+        # Score all rows (and their aspect windows) in one call so the cascade re-scores
+        # uncertain rows together and large uploads can be sharded across the scoring processes
+        codes, confidences, stages = predict_codes(texts + windows)
+        aspect_codes, aspect_confidences = codes[len(texts):], confidences[len(texts):]
+        codes, confidences, stages = codes[:len(texts)], confidences[:len(texts)], stages[:len(texts)]
+        observe(texts, codes, confidences)
         
         # Calculate summary statistics
-        sentiments = [r['sentiment'] for r in results]
+        counts = np.bincount(codes, minlength=len(SENTIMENT_MAP))
         summary = {
-            "total": len(results),
-            "positive": sentiments.count('positive'),
-            "negative": sentiments.count('negative'),
-            "neutral": sentiments.count('neutral')
+            "total": len(texts),
+            "positive": int(counts[SENTIMENT_CODES['positive']]),
+            "negative": int(counts[SENTIMENT_CODES['negative']]),
+            "neutral": int(counts[SENTIMENT_CODES['neutral']])
         }
+        model_used = "trained_model" if model is not None else "simulated_model"
+        
+        if response_format == 'columnar':
+            aspect_columns = None
+            if want_aspects:
+                aspect_columns = {
+                    "aspect_labels": ASPECTS,
+                    "aspect_rows": np.asarray(rows, dtype=np.int32),
+                    "aspect_codes": np.array([ASPECTS.index(a) for a in aspects], dtype=np.int8),
+                    "aspect_sentiment_codes": aspect_codes,
+                    "aspect_confidences": np.round(aspect_confidences, 3)
+                }
+            return columnar_response(ids, texts, codes, confidences, stages, summary, model_used, aspect_columns)
+        if response_format == 'binary':
+            return binary_response(ids, codes, confidences, summary)
+        
+        results = [
+            {
+                "id": row_id,
+                "text": text,
+                "sentiment": SENTIMENT_MAP[code],
+                "confidence": round(confidence, 3),
+                "stage": stage
+            }
+            for row_id, text, code, confidence, stage in zip(ids.tolist(), texts, codes.tolist(), confidences.tolist(), stages.tolist())
+        ]
+        if want_aspects:
+            per_text = group_aspects(len(texts), rows, aspects, mentions,
+                                     [SENTIMENT_MAP[code] for code in aspect_codes.tolist()], aspect_confidences.tolist())
+            for result, text_aspects in zip(results, per_text):
+                result["aspects"] = text_aspects
         
         return jsonify({
             "results": results,
             "summary": summary,
             "timestamp": datetime.now().isoformat(),
-            "model_used": "trained_model" if model is not None else "simulated_model"
+            "model_used": model_used
         })
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def columnar_response(ids, texts, codes, confidences, stages, summary, model_used, aspect_columns=None):
+    """Batch results as parallel arrays; texts are echoed only with ?include_text=true"""
+    stage_labels, stage_codes = np.unique(stages, return_inverse=True)
+    payload = {
+        "format": "columnar",
+        "labels": [SENTIMENT_MAP[code] for code in sorted(SENTIMENT_MAP)],
+        "ids": ids,
+        "codes": codes,
+        "confidences": np.round(confidences, 3),
+        "stage_labels": stage_labels.tolist(),
+        "stage_codes": stage_codes.astype(np.int8),
+        "summary": summary,
+        "timestamp": datetime.now().isoformat(),
+        "model_used": model_used
+    }
+    if request.args.get('include_text', 'false').lower() == 'true':
+        payload["texts"] = texts
+    if aspect_columns is not None:
+        # One entry per (row, aspect): aspect_rows indexes into ids
+        payload.update(aspect_columns)
+    
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        body = json.dumps({k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in payload.items()})
+    return Response(body, mimetype='application/json')
+
+def binary_response(ids, codes, confidences, summary):
+    """Batch results packed little-endian: uint32 n, int32 ids[n], float32 confidences[n], int8 codes[n]"""
+    body = b''.join([
+        struct.pack('<I', len(ids)),
+        ids.astype('<i4').tobytes(),
+        confidences.astype('<f4').tobytes(),
+        codes.astype('i1').tobytes()
+    ])
+    return Response(body, mimetype='application/octet-stream', headers={
+        "X-Sentiment-Labels": ",".join(SENTIMENT_MAP[code] for code in sorted(SENTIMENT_MAP)),
+        "X-Sentiment-Summary": json.dumps(summary)
+    })
+
+@app.route('/api/jobs', methods=['POST'])
+@admitted(batch_pool)
+def submit_job():
+    """Queue a CSV file for asynchronous batch analysis"""
+    file, error = get_uploaded_csv()
+    try:
+        if error:
+            return jsonify({"error": error}), 400
+        
+        if job_manager.pending() >= MAX_PENDING_JOBS:
+            return too_busy("Too many batch jobs waiting, please retry", JOB_RETRY_AFTER)
+        
+        job_id, error = job_manager.submit(file)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        return jsonify({
+            "job_id": job_id,
+            "state": "queued",
+            "status_url": f"/api/jobs/{job_id}",
+            "results_url": f"/api/jobs/{job_id}/results"
+        }), 202
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Progress and running summary of a batch job"""
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(status)
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """Results scored so far, paged with ?offset=&limit= (1000 rows by default, at most 10000)"""
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 1000, type=int), 1), 10000)
+    results = job_manager.results(job_id, offset, limit)
+    if results is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(results)
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running batch job"""
+    status = job_manager.cancel(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(status)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """Remove a finished batch job's stored upload and results"""
+    deleted = job_manager.delete(job_id)
+    if deleted is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not deleted:
+        return jsonify({"error": "Job is still queued or running; cancel it first"}), 409
+    return jsonify({"job_id": job_id, "deleted": True})
+
+@app.route('/api/aggregates', methods=['GET'])
+def get_aggregates():
+    """Sentiment rollups of stored batch job results, e.g. ?group_by=facility,week&from=2024-01-01"""
+    group_by = [d.strip() for d in request.args.get('group_by', 'week').split(',') if d.strip()]
+    if not group_by or any(d not in DIMENSIONS for d in group_by):
+        return jsonify({"error": f"group_by must list some of: {', '.join(DIMENSIONS)}"}), 400
+    
+    groups = results_store.aggregate(
+        group_by,
+        facility=request.args.get('facility'),
+        provider=request.args.get('provider'),
+        week_from=request.args.get('from'),
+        week_to=request.args.get('to'),
+        limit=min(max(request.args.get('limit', 1000, type=int), 1), 10000)
+    )
+    return jsonify({
+        "group_by": group_by,
+        "groups": groups,
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/drift', methods=['GET'])
+def get_drift():
+    """Streaming input/output readings of this worker compared against the training baseline"""
+    report = drift_monitor.report()
+    report["timestamp"] = datetime.now().isoformat()
+    return jsonify(report)
+
+@app.route('/api/admission', methods=['GET'])
+def get_admission():
+    """Queue depths, limits and shed-request counters of this worker's admission pools and job queue"""
+    return jsonify({
+        "pools": {pool.name: pool.stats() for pool in (interactive_pool, batch_pool)},
+        "jobs": {"pending": job_manager.pending(), "max_pending": MAX_PENDING_JOBS, "workers": JOB_WORKERS},
+        "limits": {"max_upload_mb": MAX_UPLOAD_MB, "max_batch_rows": MAX_BATCH_ROWS, "max_job_rows": MAX_JOB_ROWS},
+        "timestamp": datetime.now().isoformat()
+    })
+
 @app.route('/api/metrics', methods=['GET'])
 def get_metrics():
     """Get model performance metrics"""
@@ -224,8 +590,24 @@ def get_sample_reviews():
         "count": len(sample_reviews)
     })
 
-# Initialize models on startup
+# Initialize models, the parallel scorer, the drift monitor and the batch job manager on startup
 load_models()
+load_explainer()
+short_text_lookup = load_lookup(os.path.join(MODEL_DIR, LOOKUP_FILE)) if SHORT_TEXT_LOOKUP else None
+parallel_scorer = ParallelScorer(SCORING_PROCESSES) if SCORING_PROCESSES > 1 else None
+results_store = ResultsStore(RESULTS_DB)
+drift_monitor = DriftMonitor(vectorizer, load_baseline(os.path.join(MODEL_DIR, BASELINE_FILE)), DRIFT_WINDOW)
+job_manager = JobManager(
+    JOBS_DIR,
+    predict_observed,
+    DirectoryQueue(os.path.join(JOBS_DIR, 'queue')) if JOB_QUEUE == 'directory' else MemoryQueue(),
+    workers=JOB_WORKERS,
+    chunk_rows=JOB_CHUNK_ROWS,
+    results_store=results_store,
+    max_rows=MAX_JOB_ROWS,
+    ttl_seconds=JOB_TTL_HOURS * 3600 if JOB_TTL_HOURS > 0 else None,
+    admission=batch_pool
+)
 
 if __name__ == '__main__':
     app.run(port=5328, debug=True)
@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+SERVE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serve.py')
+
+SAMPLE_TEXTS = [
+    "The doctor was very professional and caring. Great experience!",
+    "Terrible service, long wait times and rude staff.",
+    "Average experience, nothing special but not bad either.",
+    "The side effects were worse than the original problem.",
+]
+
+
+def wait_until_healthy(base_url, timeout=60):
+    """Poll /api/health until the server answers or the timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def run_load(base_url, concurrency, duration):
+    """Hammer /api/analyze from `concurrency` threads and return (completed, errors, latencies)"""
+    deadline = time.time() + duration
+    completed = []
+    errors = []
+    lock = threading.Lock()
+
+    def client(client_id):
+        latencies = []
+        failures = 0
+        i = client_id
+        while time.time() < deadline:
+            body = json.dumps({"text": SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]}).encode()
+            request = urllib.request.Request(f"{base_url}/api/analyze", data=body,
+                                             headers={"Content-Type": "application/json"})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                latencies.append(time.perf_counter() - start)
+            except OSError:
+                failures += 1
+            i += 1
+        with lock:
+            completed.extend(latencies)
+            errors.append(failures)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return len(completed), sum(errors), sorted(completed)
+
+
+def csv_upload(rows):
+    """multipart/form-data body and content type of a rows-row review CSV"""
+    boundary = uuid.uuid4().hex
+    lines = ['review'] + [f'"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]}"' for i in range(rows)]
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"load.csv\"\r\n"
+            f"Content-Type: text/csv\r\n\r\n" + "\n".join(lines) + f"\r\n--{boundary}--\r\n").encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def start_batch_load(base_url, clients, rows, stop):
+    """Upload CSVs to /api/analyze-batch from `clients` threads until stop is set; returns (threads, counts)"""
+    body, content_type = csv_upload(rows)
+    counts = {'completed': 0, 'shed': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def client():
+        while not stop.is_set():
+            request = urllib.request.Request(f"{base_url}/api/analyze-batch", data=body,
+                                             headers={"Content-Type": content_type})
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                outcome = 'completed'
+            except urllib.error.HTTPError as e:
+                outcome = 'shed' if e.code == 429 else 'failed'
+                if e.code == 429:
+                    # Honour Retry-After, but keep the pressure on within a short run
+                    stop.wait(min(float(e.headers.get('Retry-After', 1)), 1.0))
+            except OSError:
+                outcome = 'failed'
+            with lock:
+                counts[outcome] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    return threads, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API requests per second as the worker count scales")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=5399)
+    parser.add_argument('--batch-clients', type=int, default=0,
+                        help="Threads uploading CSVs to /api/analyze-batch during the measured run")
+    parser.add_argument('--batch-rows', type=int, default=5000, help="Rows per uploaded CSV")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    rows = []
+
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [sys.executable, SERVE_SCRIPT, '--host', '127.0.0.1', '--port', str(args.port),
+             '--workers', str(workers), '--threads', str(args.threads)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            if not wait_until_healthy(base_url):
+                print(f"Server with {workers} worker(s) did not become healthy")
+                continue
+            run_load(base_url, args.concurrency, 1.0)  # warm up every worker
+            stop = threading.Event()
+            batch_threads, batch = start_batch_load(base_url, args.batch_clients, args.batch_rows, stop)
+            completed, errors, latencies = run_load(base_url, args.concurrency, args.duration)
+            stop.set()
+            for thread in batch_threads:
+                thread.join()
+        finally:
+            server.terminate()
+            server.wait()
+
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else float('nan')
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+        rows.append((workers, completed / args.duration, p50, p99, errors))
+        print(f"{workers} worker(s): {completed / args.duration:.1f} req/s")
+        if args.batch_clients:
+            print(f"  batch uploads: {batch['completed']} completed, {batch['shed']} shed (429), {batch['failed']} failed")
+
+    print("\n" + "=" * 60)
+    print(f"{'Workers':>8} {'Req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Errors':>8}")
+    print("=" * 60)
+    for workers, rps, p50, p99, errors in rows:
+        print(f"{workers:>8} {rps:>10.1f} {p50:>10.1f} {p99:>10.1f} {errors:>8}")
+    baseline = next((rps for workers, rps, *_ in rows if workers == 1), 0)
+    if baseline > 0:
+        print("\nScaling vs 1 worker: " + ", ".join(f"{w}: {rps / baseline:.2f}x" for w, rps, *_ in rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from serving_model import load_artifacts, score_texts
+
+# Set in each pool worker by _init_worker
+_artifacts = None
+
+
+def _init_worker():
+    """Load the serving model once per pool worker, without the rest of the API"""
+    global _artifacts
+    _artifacts = load_artifacts()
+    if _artifacts is None:
+        raise RuntimeError("No trained model files to score with")
+
+
+def _score_shard(texts):
+    codes, confidences, stages = score_texts(texts, *_artifacts)
+    return codes, confidences.astype(np.float32), stages
+
+
+class ParallelScorer:
+    """Shards large batches across a process pool and reassembles compact result arrays"""
+
+    def __init__(self, processes, shards_per_process=4):
+        self.processes = processes
+        self.shards_per_process = shards_per_process
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created on first use with 'spawn' so workers never inherit request threads or locks
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken pool so the next call starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def score(self, texts):
+        """Label codes (int8), confidences (float32) and stages for texts, in input order"""
+        n_shards = min(len(texts), self.processes * self.shards_per_process)
+        bounds = np.linspace(0, len(texts), n_shards + 1).astype(int)
+        shards = [texts[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+        # A worker that died (e.g. killed for memory) breaks the whole pool; it is replaced and the
+        # batch retried once, after which the error reaches the caller's in-process fallback
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                parts = list(executor.map(_score_shard, shards))
+                break
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                if attempt == 1:
+                    raise
+        return (np.concatenate([p[0] for p in parts]),
+                np.concatenate([p[1] for p in parts]),
+                np.concatenate([p[2] for p in parts]))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
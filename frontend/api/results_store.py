@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+
+DIMENSIONS = ('facility', 'provider', 'week')
+SENTIMENTS = ('negative', 'positive', 'neutral')
+UNKNOWN = 'unknown'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scored_reviews (
+    job_id TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    facility TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    week TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    confidence REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scored_reviews_job ON scored_reviews (job_id);
+CREATE TABLE IF NOT EXISTS weekly_rollups (
+    facility TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    week TEXT NOT NULL,
+    negative INTEGER NOT NULL DEFAULT 0,
+    positive INTEGER NOT NULL DEFAULT 0,
+    neutral INTEGER NOT NULL DEFAULT 0,
+    confidence_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (facility, provider, week)
+);
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO weekly_rollups (facility, provider, week, negative, positive, neutral, confidence_sum)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (facility, provider, week) DO UPDATE SET
+    negative = negative + excluded.negative,
+    positive = positive + excluded.positive,
+    neutral = neutral + excluded.neutral,
+    confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+
+
+def week_starts(dates, default):
+    """Monday (YYYY-MM-DD) of each date in a pandas Series; unparseable dates fall back to default"""
+    import pandas as pd
+
+    # Uploads mix date formats and time zones, so every value is parsed on its own
+    parsed = pd.to_datetime(dates, errors='coerce', utc=True, format='mixed')
+    weeks = (parsed - pd.to_timedelta(parsed.dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+    return weeks.fillna(default).tolist()
+
+
+def describe_rows(rows, metadata_columns, default_date):
+    """Facility, provider and week lists for a DataFrame of rows, given the CSV's metadata columns"""
+    import pandas as pd
+
+    def values(field):
+        if field not in metadata_columns:
+            return [UNKNOWN] * len(rows)
+        column = rows[metadata_columns[field]].astype(str).str.strip()
+        return column.where(rows[metadata_columns[field]].notna() & (column != ''), UNKNOWN).tolist()
+
+    # Reviews without a usable date count towards the week of default_date
+    default_week = week_starts(pd.Series([default_date]), UNKNOWN)[0]
+    if 'date' not in metadata_columns:
+        return values('facility'), values('provider'), [default_week] * len(rows)
+    return values('facility'), values('provider'), week_starts(rows[metadata_columns['date']], default_week)
+
+
+class ResultsStore:
+    """Local SQLite store of scored reviews with weekly rollups kept up to date on every append"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        # sqlite3 connections are not shared across threads, so each thread keeps its own;
+        # the file is only created on first use, never at import time
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            self._local.connection = connection
+            with self._lock:
+                if not self._initialized:
+                    # WAL lets aggregate queries from every worker process read while a job appends
+                    connection.execute('PRAGMA journal_mode=WAL')
+                    connection.executescript(SCHEMA)
+                    self._initialized = True
+        return connection
+
+    def append(self, job_id, row_ids, facilities, providers, weeks, sentiments, confidences):
+        """Store scored rows and fold them into the rollups in one transaction"""
+        rows = list(zip([job_id] * len(row_ids), row_ids, facilities, providers, weeks, sentiments,
+                        [float(c) for c in confidences]))
+
+        # Pre-aggregate the chunk so each (facility, provider, week) is upserted once
+        rollups = {}
+        for _, _, facility, provider, week, sentiment, confidence in rows:
+            counts = rollups.setdefault((facility, provider, week), [0, 0, 0, 0.0])
+            counts[SENTIMENTS.index(sentiment)] += 1
+            counts[3] += confidence
+
+        with self._connect() as connection:
+            connection.executemany('INSERT INTO scored_reviews VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            connection.executemany(UPSERT_ROLLUP, [key + tuple(counts) for key, counts in rollups.items()])
+
+    def aggregate(self, group_by, facility=None, provider=None, week_from=None, week_to=None, limit=1000):
+        """Sentiment counts grouped by any of facility/provider/week, read from the rollups only"""
+        if not group_by or any(d not in DIMENSIONS for d in group_by):
+            raise ValueError(f"group_by must list some of {', '.join(DIMENSIONS)}")
+
+        conditions, parameters = [], []
+        for column, operator, value in (('facility', '=', facility), ('provider', '=', provider),
+                                        ('week', '>=', week_from), ('week', '<=', week_to)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+
+        columns = ', '.join(group_by)
+        query = (f"SELECT {columns}, SUM(negative), SUM(positive), SUM(neutral), SUM(confidence_sum) "
+                 f"FROM weekly_rollups {'WHERE ' + ' AND '.join(conditions) if conditions else ''} "
+                 f"GROUP BY {columns} ORDER BY {columns} LIMIT ?")
+
+        groups = []
+        for row in self._connect().execute(query, parameters + [limit]):
+            keys, (negative, positive, neutral, confidence_sum) = row[:len(group_by)], row[len(group_by):]
+            total = negative + positive + neutral
+            group = dict(zip(group_by, keys))
+            group.update({
+                "total": total, "positive": positive, "negative": negative, "neutral": neutral,
+                "positive_share": round(positive / total, 4) if total else 0.0,
+                "negative_share": round(negative / total, 4) if total else 0.0,
+                "mean_confidence": round(confidence_sum / total, 4) if total else 0.0
+            })
+            groups.append(group)
+        return groups
@@ -0,0 +1,60 @@
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class PreloadedApplication(BaseApplication):
+    """Gunicorn application that loads the API and its models once in the master process"""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from index import app
+
+        # Keep the cyclic GC from touching the preloaded objects so forked
+        # workers share the model pages copy-on-write instead of copying them
+        gc.freeze()
+        return app
+
+
+def parse_args():
+    """Parse launcher options, falling back to the usual PaaS environment variables"""
+    parser = argparse.ArgumentParser(description="Run the sentiment API with preloaded pre-forked workers")
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5328)))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count())))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('GUNICORN_THREADS', 4)))
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('GUNICORN_TIMEOUT', 120)))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    options = {
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'preload_app': True,
+        'accesslog': None,
+    }
+    print(f"Starting {args.workers} worker(s) x {args.threads} thread(s) on {options['bind']}")
+    PreloadedApplication(options).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+
+# Trained artifacts and the cascade/compact_model helpers live at the repository root.
+# joblib and scikit-learn are imported only when the pickles have to be loaded.
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODEL_DIR = os.environ.get('SENTIMENT_MODEL_DIR', ROOT_DIR)
+# e.g. sentiment_model.int8.npz (train_sentiment_model.py --quantize 8) on memory-constrained hosts
+COMPACT_MODEL_FILE = os.environ.get('SENTIMENT_COMPACT_MODEL', 'sentiment_model.npz')
+# 'model' serves the single best model, 'cascade' gates NB -> RandomForest on confidence
+INFERENCE_MODE = os.environ.get('SENTIMENT_INFERENCE_MODE', 'model')
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from cascade import score_stage, predict_cascade
+from compact_model import load_compact_model, matches_pickles
+
+
+def load_artifacts():
+    """(vectorizer, model, calibration, cascade) from MODEL_DIR, or None without trained files"""
+    model_path = os.path.join(MODEL_DIR, 'sentiment_model.pkl')
+    vectorizer_path = os.path.join(MODEL_DIR, 'tfidf_vectorizer.pkl')
+
+    # Startup-optimized path: NumPy-only artifact, no scikit-learn import. It is skipped when
+    # it was not exported from the pickles next to it (e.g. left over from an earlier NB model)
+    compact_path = os.path.join(MODEL_DIR, COMPACT_MODEL_FILE)
+    if INFERENCE_MODE != 'cascade' and os.path.exists(compact_path):
+        if matches_pickles(compact_path, model_path, vectorizer_path):
+            vectorizer, model, calibration = load_compact_model(compact_path)
+            print("Models loaded successfully from compact artifact")
+            return vectorizer, model, calibration, None
+        print(f"Ignoring {COMPACT_MODEL_FILE}: it does not match the pickled model")
+
+    if not (os.path.exists(model_path) and os.path.exists(vectorizer_path)):
+        return None
+    import joblib
+    calibration_path = os.path.join(MODEL_DIR, 'calibration.pkl')
+    cascade_path = os.path.join(MODEL_DIR, 'cascade.pkl')
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path)
+    calibration = joblib.load(calibration_path) if os.path.exists(calibration_path) else None
+    cascade = None
+    if INFERENCE_MODE == 'cascade' and os.path.exists(cascade_path):
+        cascade = joblib.load(cascade_path)
+    print("Models loaded successfully from trained files")
+    return vectorizer, model, calibration, cascade
+
+
+def score_texts(texts, vectorizer, model, calibration=None, cascade=None, X=None):
+    """Score texts into int8 label codes, confidences and answering stages; X may hold them already vectorized"""
+    # Vectorize once and score the whole list with the trained model(s)
+    texts_vectorized = X if X is not None else vectorizer.transform(texts)
+    if cascade is not None:
+        predictions, confidences, stages = predict_cascade(texts_vectorized, cascade)
+    else:
+        predictions, confidences = score_stage(model, texts_vectorized, calibration)
+        stages = np.full(len(texts), 'model')
+    return predictions.astype(np.int8), confidences, stages
@@ -29,6 +29,13 @@ interface BatchAnalysisResult {
   timestamp: string
 }
 
+interface JobStatus {
+  job_id: string
+  state: "queued" | "running" | "completed" | "failed" | "cancelled"
+  progress: number
+  error: string | null
+}
+
 export function BatchAnalysis() {
   const [file, setFile] = useState<File | null>(null)
   const [results, setResults] = useState<BatchAnalysisResult | null>(null)
@@ -36,6 +43,7 @@ export function BatchAnalysis() {
   const [error, setError] = useState("")
   const [uploadProgress, setUploadProgress] = useState(0)
   const fileInputRef = useRef<HTMLInputElement>(null)
+  const jobIdRef = useRef<string | null>(null)
 
   const handleFileSelect = (event: React.ChangeEvent<HTMLInputElement>) => {
     const selectedFile = event.target.files?.[0]
@@ -63,40 +71,57 @@ export function BatchAnalysis() {
     formData.append("file", file)
 
     try {
-      // Simulate upload progress
-      const progressInterval = setInterval(() => {
-        setUploadProgress((prev) => {
-          if (prev >= 90) {
-            clearInterval(progressInterval)
-            return 90
-          }
-          return prev + 10
-        })
-      }, 200)
-
-      const response = await fetch("/api/analyze-batch", {
+      // Submit the file as a background job so large uploads don't hit request timeouts
+      const response = await fetch("/api/jobs", {
         method: "POST",
         body: formData,
       })
 
-      clearInterval(progressInterval)
-      setUploadProgress(100)
-
       if (!response.ok) {
         const errorData = await response.json()
         throw new Error(errorData.error || "Batch analysis failed")
       }
 
-      const data = await response.json()
+      const { job_id } = await response.json()
+      jobIdRef.current = job_id
+
+      // Poll until the job finishes; progress reflects rows actually scored
+      let status: JobStatus
+      do {
+        await new Promise((resolve) => setTimeout(resolve, 500))
+        const statusResponse = await fetch(`/api/jobs/${job_id}`)
+        if (!statusResponse.ok) {
+          throw new Error("Lost track of the batch job")
+        }
+        status = await statusResponse.json()
+        setUploadProgress(Math.round(status.progress * 100))
+      } while (status.state === "queued" || status.state === "running")
+
+      if (status.state !== "completed") {
+        throw new Error(status.error || `Batch analysis ${status.state}`)
+      }
+
+      const resultsResponse = await fetch(`/api/jobs/${job_id}/results`)
+      if (!resultsResponse.ok) {
+        throw new Error("Could not fetch batch results")
+      }
+
+      const data = await resultsResponse.json()
       setResults(data)
     } catch (err) {
       setError(err instanceof Error ? err.message : "An error occurred")
     } finally {
+      jobIdRef.current = null
       setLoading(false)
       setTimeout(() => setUploadProgress(0), 1000)
     }
   }
 
+  const cancelBatch = async () => {
+    if (!jobIdRef.current) return
+    await fetch(`/api/jobs/${jobIdRef.current}/cancel`, { method: "POST" })
+  }
+
   const downloadResults = () => {
     if (!results) return
 
@@ -183,6 +208,9 @@ export function BatchAnalysis() {
                 <span>{uploadProgress}%</span>
               </div>
               <Progress value={uploadProgress} className="w-full" />
+              <Button variant="outline" size="sm" onClick={cancelBatch}>
+                Cancel
+              </Button>
             </div>
           )}
 
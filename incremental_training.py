@@ -0,0 +1,164 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SENTIMENT_LABELS = {'negative': 0, 'positive': 1, 'neutral': 2}
+STATE_FILE = 'incremental_state.pkl'
+HISTORY_FILE = 'incremental_reviews.csv'
+DEFAULT_DRIFT_THRESHOLD = 0.05
+
+
+def count_terms(vectorizer, texts):
+    """Per-feature document frequencies and (covered, total) term occurrences of texts"""
+    analyze = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    present = []
+    covered = total = 0
+
+    for text in texts:
+        terms = analyze(text)
+        indices = [vocabulary[term] for term in terms if term in vocabulary]
+        present.extend(set(indices))
+        covered += len(indices)
+        total += len(terms)
+
+    document_frequency = np.bincount(np.asarray(present, dtype=np.int64), minlength=len(vocabulary))
+    return document_frequency, covered, total
+
+
+def build_state(vectorizer, texts, reference_texts):
+    """Document-frequency state of a fitted vectorizer over the corpus it was fitted on"""
+    document_frequency, _, _ = count_terms(vectorizer, texts)
+    # Held-out reviews give the out-of-vocabulary rate of unseen but in-distribution text
+    _, covered, total = count_terms(vectorizer, reference_texts)
+    return {
+        'document_frequency': document_frequency,
+        'n_documents': len(texts),
+        'baseline_oov_rate': 1 - covered / total if total else 0.0,
+        'new_documents': 0,
+        'new_terms': 0,
+        'new_oov_terms': 0,
+    }
+
+
+def update_idf(vectorizer, state):
+    """Recompute the vectorizer's IDF weights from the accumulated document frequencies"""
+    smooth = int(vectorizer.smooth_idf)
+    n_documents = state['n_documents'] + smooth
+    document_frequency = state['document_frequency'] + smooth
+    vectorizer.idf_ = (np.log(n_documents / document_frequency) + 1).astype(vectorizer.dtype)
+
+
+def vocabulary_drift(state):
+    """Out-of-vocabulary rate of the reviews folded in since the last rebuild, above the training rate"""
+    if state['new_terms'] == 0:
+        return 0.0
+    return max(state['new_oov_terms'] / state['new_terms'] - state['baseline_oov_rate'], 0.0)
+
+
+def fold_in(state, vectorizer, models, texts, labels):
+    """Add labeled reviews to the document frequencies, IDF weights and NB counts; returns the drift"""
+    document_frequency, covered, total = count_terms(vectorizer, texts)
+    state['document_frequency'] += document_frequency
+    state['n_documents'] += len(texts)
+    state['new_documents'] += len(texts)
+    state['new_terms'] += total
+    state['new_oov_terms'] += total - covered
+
+    update_idf(vectorizer, state)
+    X = vectorizer.transform(texts)
+    for model in models:
+        # Counts folded in earlier keep the IDF weights they were scaled with until the next rebuild
+        model.partial_fit(X, labels)
+    return vocabulary_drift(state)
+
+
+def load_new_reviews(path):
+    """Texts and integer labels of a CSV with 'processed_review' and 'sentiment' columns"""
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=['processed_review', 'sentiment'])
+    df = df.dropna(subset=['processed_review'])
+    df = df[df['processed_review'].str.strip() != '']
+    df = df[df['sentiment'].isin(SENTIMENT_LABELS)]
+    return df, df['processed_review'].tolist(), df['sentiment'].map(SENTIMENT_LABELS).to_numpy()
+
+
+def record_history(df):
+    """Append reviews to HISTORY_FILE, which the next full training run includes"""
+    df.to_csv(HISTORY_FILE, mode='a', header=not os.path.exists(HISTORY_FILE), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold new labeled reviews into the trained model without a full retrain")
+    parser.add_argument('csv', help="CSV with 'processed_review' and 'sentiment' columns")
+    parser.add_argument('--drift-threshold', type=float, default=DEFAULT_DRIFT_THRESHOLD,
+                        help="Excess out-of-vocabulary rate that triggers a full rebuild")
+    args = parser.parse_args()
+
+    import joblib
+    from sklearn.naive_bayes import ComplementNB, MultinomialNB
+    from compact_model import export_compact_model, pickle_fingerprint, QUANTIZED_DTYPES, QUANTIZED_FILE
+
+    start = time.perf_counter()
+    if not os.path.exists(STATE_FILE):
+        print(f"{STATE_FILE} not found. Please run train_sentiment_model.py first.")
+        return
+
+    df, texts, labels = load_new_reviews(args.csv)
+    if not texts:
+        print("No labeled reviews to fold in.")
+        return
+
+    model = joblib.load('sentiment_model.pkl')
+    if not isinstance(model, (ComplementNB, MultinomialNB)):
+        # New IDF weights would change the features a forest's splits were learned on
+        record_history(df)
+        print(f"The served model is a {type(model).__name__}, which cannot be updated incrementally. "
+              f"The reviews were added to {HISTORY_FILE}; run train_sentiment_model.py to include them.")
+        return
+
+    state = joblib.load(STATE_FILE)
+    vectorizer = joblib.load('tfidf_vectorizer.pkl')
+    drift = fold_in(state, vectorizer, [model], texts, labels)
+    print(f"Folded in {len(texts)} reviews ({state['new_documents']} since the last rebuild, "
+          f"{state['n_documents']} documents in total)")
+    print(f"Vocabulary drift: {drift:.4f} (threshold {args.drift_threshold:.4f})")
+
+    if drift > args.drift_threshold:
+        print("Drift threshold exceeded, rebuilding the vocabulary with a full retrain...")
+        record_history(df)
+        if subprocess.run([sys.executable, 'train_sentiment_model.py']).returncode != 0:
+            print(f"The retrain failed. The reviews were added to {HISTORY_FILE}; "
+                  f"rerun train_sentiment_model.py (not this script) to include them.")
+            sys.exit(1)
+        return
+
+    joblib.dump(vectorizer, 'tfidf_vectorizer.pkl')
+    joblib.dump(model, 'sentiment_model.pkl')
+    # The calibration tables were fitted to the old scores, and the cascade's RandomForest stage to
+    # the old IDF weights; both are dropped until the next full training run rebuilds them
+    for path in ('calibration.pkl', 'cascade.pkl'):
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed {path}; the next full training run rebuilds it")
+
+    # Compact and quantized artifacts are re-exported from the updated weights
+    fingerprint = pickle_fingerprint('sentiment_model.pkl', 'tfidf_vectorizer.pkl')
+    export_compact_model('sentiment_model.npz', vectorizer, model, fingerprint=fingerprint)
+    for bits in QUANTIZED_DTYPES:
+        if os.path.exists(QUANTIZED_FILE.format(bits=bits)):
+            export_compact_model(QUANTIZED_FILE.format(bits=bits), vectorizer, model, quantize_bits=bits,
+                                 fingerprint=fingerprint)
+    joblib.dump(state, STATE_FILE)
+    # Recorded only once the update is saved, so a failed run can be retried without counting them twice
+    record_history(df)
+    print(f"Incremental update finished in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(ROOT_DIR, 'frontend', 'api')
+
+# Largest confidence difference accepted between an exact backend and the reference
+CONFIDENCE_TOLERANCE = 1e-6
+# Inputs the generated corpus and the test_model.py strings do not cover
+EDGE_CASES = [
+    "", "   ", "!!!", "Das Essen war sehr gut und die Ärzte freundlich", "GREAT!!! great... Great",
+    "not good", "🙂 caring nurse 🙂", "wait-time was 3h; billing = $$$", "ok",
+    " ".join(["The staff was rude but the doctor was excellent."] * 40),
+]
+
+
+def build_corpus(n_rows=2000, seed=42):
+    """Generated reviews plus the test_model.py strings and edge cases"""
+    from data_generation import generate_chunk, SENTIMENTS
+    from test_model import TEST_REVIEWS, SHORT_POSITIVE_REVIEWS
+
+    rng = np.random.default_rng(seed)
+    class_mix = np.full(len(SENTIMENTS), 1 / len(SENTIMENTS))
+    generated = generate_chunk(rng, n_rows, class_mix, np.array([0.4, 0.3, 0.2, 0.1]))['review'].tolist()
+    return generated + TEST_REVIEWS + SHORT_POSITIVE_REVIEWS + EDGE_CASES
+
+
+def served_scores(model, X, calibration):
+    """Labels and served (calibrated) confidences of one scoring call"""
+    from cascade import score_stage
+    labels, confidences = score_stage(model, X, calibration)
+    return np.asarray(labels), np.asarray(confidences, dtype=np.float64)
+
+
+def reference_backend(model, vectorizer, calibration):
+    """model.predict/predict_proba one text at a time, as test_model.py does"""
+    from calibration import apply_calibration
+
+    def score(texts):
+        labels, confidences = [], []
+        for text in texts:
+            X = vectorizer.transform([text])
+            probabilities = model.predict_proba(X)
+            label = model.predict(X)[0]
+            if calibration is not None:
+                probabilities = apply_calibration(probabilities, calibration)
+            labels.append(label)
+            confidences.append(probabilities[0, list(model.classes_).index(label)])
+        return np.array(labels), np.array(confidences)
+    return score
+
+
+def compact_backend(artifact_path):
+    """Batch scoring with a compact .npz artifact"""
+    from compact_model import load_compact_model
+    vectorizer, model, calibration = load_compact_model(artifact_path)
+    return lambda texts: served_scores(model, vectorizer.transform(texts), calibration)
+
+
+def per_row(score):
+    """Backend that calls score once per text, as single-review requests do"""
+    def score_rows(texts):
+        parts = [score([text]) for text in texts]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+    return score_rows
+
+
+def load_backends(model_dir, processes=0, include_api=True):
+    """(reference, exact, approximate) backends available in model_dir
+
+    Exact backends must reproduce the reference; approximate ones (the short-text
+    lookup, the cascade, quantized artifacts) answer differently by design and only
+    report agreement.
+    Each backend maps a list of texts to (labels, confidences).
+    """
+    import joblib
+
+    from compact_model import QUANTIZED_DTYPES, QUANTIZED_FILE
+
+    path = lambda name: os.path.join(model_dir, name)
+    model = joblib.load(path('sentiment_model.pkl'))
+    vectorizer = joblib.load(path('tfidf_vectorizer.pkl'))
+    calibration = joblib.load(path('calibration.pkl')) if os.path.exists(path('calibration.pkl')) else None
+
+    exact = {'sklearn batch': lambda texts: served_scores(model, vectorizer.transform(texts), calibration)}
+    approximate = {}
+
+    if os.path.exists(path('sentiment_model.npz')):
+        exact['compact batch'] = compact_backend(path('sentiment_model.npz'))
+        exact['compact per row'] = per_row(exact['compact batch'])
+    for bits in sorted(QUANTIZED_DTYPES):
+        if os.path.exists(path(QUANTIZED_FILE.format(bits=bits))):
+            approximate[f'int{bits} compact'] = compact_backend(path(QUANTIZED_FILE.format(bits=bits)))
+
+    if include_api:
+        # The API reads its model directory at import time
+        os.environ['SENTIMENT_MODEL_DIR'] = model_dir
+        os.environ['SENTIMENT_INFERENCE_MODE'] = 'model'
+        sys.path.insert(0, API_DIR)
+        import index
+        exact['api score_codes'] = lambda texts: index.score_codes(texts)[:2]
+        exact['api per row'] = per_row(exact['api score_codes'])
+        if processes > 1:
+            from parallel_scoring import ParallelScorer
+            scorer = ParallelScorer(processes)
+            exact['api parallel'] = lambda texts: scorer.score(texts)[:2]
+        if index.short_text_lookup is not None:
+            approximate['short-text lookup'] = lambda texts: covered_scores(index.short_text_lookup, texts)
+
+    if os.path.exists(path('cascade.pkl')):
+        from cascade import predict_cascade
+        cascade = joblib.load(path('cascade.pkl'))
+        approximate['cascade'] = lambda texts: predict_cascade(vectorizer.transform(texts), cascade)[:2]
+
+    return reference_backend(model, vectorizer, calibration), exact, approximate
+
+
+def covered_scores(lookup, texts):
+    """Lookup answers with NaN confidence (and label -1) for the texts it does not cover"""
+    labels, confidences = np.full(len(texts), -1), np.full(len(texts), np.nan)
+    rows, hit_labels, hit_confidences, _ = lookup.lookup_many(texts)
+    labels[rows], confidences[rows] = hit_labels, hit_confidences
+    return labels, confidences
+
+
+def timed(score, texts, repeat):
+    """Output of score(texts) and its best wall time over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = score(texts)
+        best = min(best, time.perf_counter() - start)
+    return output, best
+
+
+def compare_backends(model_dir, texts, repeat=3, processes=0, include_api=True):
+    """One result dict per backend: label agreement, max confidence difference, time and speedup"""
+    reference, exact, approximate = load_backends(model_dir, processes, include_api)
+    (reference_labels, reference_confidences), reference_time = timed(reference, texts, 1)
+
+    results = [{'backend': 'reference', 'kind': 'reference', 'rows': len(texts), 'label_agreement': 1.0,
+                'max_confidence_diff': 0.0, 'seconds': reference_time, 'speedup': 1.0, 'passed': True}]
+    for kind, backends in (('exact', exact), ('approximate', approximate)):
+        for name, score in backends.items():
+            score(texts[:10])  # warm up lazily built state (pools, caches)
+            (labels, confidences), seconds = timed(score, texts, repeat)
+            labels, confidences = np.asarray(labels), np.asarray(confidences, dtype=np.float64)
+            answered = ~np.isnan(confidences)
+            agreement = float(np.mean(labels[answered] == reference_labels[answered])) if answered.any() else 0.0
+            difference = float(np.abs(confidences[answered] - reference_confidences[answered]).max(initial=0.0))
+            results.append({
+                'backend': name, 'kind': kind, 'rows': int(answered.sum()), 'label_agreement': agreement,
+                'max_confidence_diff': difference, 'seconds': seconds, 'speedup': reference_time / seconds,
+                'passed': kind == 'approximate' or (agreement == 1.0 and difference <= CONFIDENCE_TOLERANCE),
+            })
+    return results
+
+
+def print_results(results):
+    print(f"{'Backend':<20} {'Kind':<12} {'Rows':>6} {'Labels':>8} {'Max conf diff':>14} {'Time (ms)':>10} {'Speedup':>8}  Result")
+    print("-" * 96)
+    for r in results:
+        status = 'info' if r['kind'] == 'approximate' else ('ok' if r['passed'] else 'FAIL')
+        print(f"{r['backend']:<20} {r['kind']:<12} {r['rows']:>6} {r['label_agreement'] * 100:>7.2f}% "
+              f"{r['max_confidence_diff']:>14.2e} {r['seconds'] * 1000:>10.1f} {r['speedup']:>7.1f}x  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every inference backend against model.predict and time it")
+    parser.add_argument('--model-dir', default=ROOT_DIR, help="Directory with the trained artifacts")
+    parser.add_argument('--rows', type=int, default=2000, help="Generated reviews in the corpus")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per backend (best is kept)")
+    parser.add_argument('--processes', type=int, default=0, help="Also check the API's parallel scorer")
+    args = parser.parse_args()
+
+    texts = build_corpus(args.rows, args.seed)
+    print(f"Corpus: {len(texts)} texts ({args.rows} generated)")
+    results = compare_backends(args.model_dir, texts, args.repeat, args.processes)
+    print_results(results)
+    failed = [r['backend'] for r in results if not r['passed']]
+    if failed:
+        print(f"\nBackends disagreeing with the reference: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"\nAll exact backends match the reference within {CONFIDENCE_TOLERANCE:g}")
+
+
+if __name__ == "__main__":
+    main()
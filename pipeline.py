@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+
+import joblib
+
+# Bump when a stage's code changes in a way its config does not capture, to invalidate old caches
+PIPELINE_VERSION = 1
+DEFAULT_CACHE_DIR = '.pipeline_cache'
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_key(name, config, inputs):
+    """Hash of a stage's name, config and inputs (file digests and upstream stage keys)"""
+    payload = json.dumps({'version': PIPELINE_VERSION, 'stage': name, 'config': config, 'inputs': inputs},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def apply_overrides(config, assignments):
+    """Set dotted config keys from 'section.key=value' strings; values are parsed as JSON when possible"""
+    for assignment in assignments:
+        path, _, raw = assignment.partition('=')
+        if not raw:
+            raise ValueError(f"Expected section.key=value, got {assignment!r}")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        *sections, key = path.split('.')
+        target = config
+        for section in sections:
+            if not isinstance(target.get(section), dict):
+                raise KeyError(f"Unknown config section {section!r} in {path!r}")
+            target = target[section]
+        if key not in target:
+            raise KeyError(f"Unknown config key {path!r}")
+        target[key] = value
+    return config
+
+
+class StageCache:
+    """Runs pipeline stages, reusing outputs stored under cache_dir for an unchanged key
+
+    A stage's key covers its config and its inputs, which are the keys of the
+    stages it consumes, so a change re-runs that stage and everything downstream
+    of it. None is never cached, so a stage can return None to retry next run.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, enabled=True, force=()):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.force = set(force)
+        self.runs = []
+
+    def run(self, name, config, inputs, compute):
+        """(key, output) of a stage, loaded from the cache or computed and stored"""
+        key = stage_key(name, config, inputs)
+        path = os.path.join(self.cache_dir, f"{name.replace(' ', '_')}-{key}.joblib")
+
+        if self.enabled and name not in self.force and os.path.exists(path):
+            print(f"[{name}] cached ({key})")
+            self.runs.append((name, key, 'cached'))
+            return key, joblib.load(path)
+
+        print(f"[{name}] running ({key})")
+        output = compute()
+        self.runs.append((name, key, 'ran'))
+        if self.enabled and output is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            joblib.dump(output, path + '.tmp')
+            os.replace(path + '.tmp', path)
+        return key, output
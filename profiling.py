@@ -0,0 +1,134 @@
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def read_rss_mb():
+    """(current, peak) resident set size in MB, either None when unavailable; peak is since the last reset_peak_rss()"""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError):
+        # No procfs: ru_maxrss is the process-lifetime peak (KB on Linux, bytes on macOS)
+        try:
+            import resource  # Unix only
+        except ImportError:
+            return None, None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+        return None, peak_mb
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter so the next reading covers one stage; False if unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def take_snapshot():
+    """tracemalloc snapshot without the profiler's own bookkeeping allocations"""
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+class StageProfiler:
+    """Opt-in wall time, peak RSS and tracemalloc report for consecutive pipeline stages
+
+    stage(name) closes the running stage and opens the next one; finish() closes the last.
+    The JSON report is rewritten after every stage, so a run killed for memory still names
+    the stage that was running.
+    """
+
+    def __init__(self, report_path=None, top_allocations=5):
+        self.report_path = report_path
+        self.enabled = bool(report_path)
+        self.top_allocations = top_allocations
+        self.stages = []
+        self._current = None
+
+        if self.enabled:
+            tracemalloc.start()
+            self._started = time.perf_counter()
+            self.report = {
+                'created_at': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'argv': sys.argv,
+                'stages': self.stages,
+                'running': None,
+            }
+
+    def stage(self, name):
+        if not self.enabled:
+            return
+        self._close()
+        self._current = {
+            'name': name,
+            'start': time.perf_counter(),
+            'per_stage_rss': reset_peak_rss(),
+            'snapshot': take_snapshot(),
+        }
+        tracemalloc.reset_peak()
+        self.report['running'] = name
+        self._write()
+
+    def finish(self):
+        if not self.enabled:
+            return
+        self._close()
+        self.report['running'] = None
+        self.report['total_seconds'] = round(time.perf_counter() - self._started, 3)
+        self.report['max_peak_rss_mb'] = max((s['peak_rss_mb'] for s in self.stages if s['peak_rss_mb'] is not None),
+                                             default=None)
+        self.report['versions'] = {name: getattr(sys.modules[name], '__version__', None)
+                                   for name in ('numpy', 'pandas', 'sklearn', 'scipy') if name in sys.modules}
+        self._write()
+        tracemalloc.stop()
+        self.print_summary()
+
+    def print_summary(self):
+        print("\n" + "=" * 72)
+        print(f"{'Stage':<28} {'Wall (s)':>10} {'Peak RSS (MB)':>14} {'Traced peak (MB)':>17}")
+        print("=" * 72)
+        for s in self.stages:
+            peak_rss = f"{s['peak_rss_mb']:.1f}" if s['peak_rss_mb'] is not None else 'n/a'
+            print(f"{s['name']:<28} {s['wall_seconds']:>10.2f} {peak_rss:>14} {s['traced_peak_mb']:>17.1f}")
+        print(f"Profile report written to {self.report_path}")
+
+    def _close(self):
+        if self._current is None:
+            return
+        current, self._current = self._current, None
+        wall = time.perf_counter() - current['start']
+        _, traced_peak = tracemalloc.get_traced_memory()
+        rss, peak_rss = read_rss_mb()
+
+        # Net allocations made during the stage that are still alive, grouped by source line
+        differences = take_snapshot().compare_to(current['snapshot'], 'lineno')
+        top = [{'location': f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                'size_mb': round(d.size_diff / 1e6, 3), 'count': d.count_diff}
+               for d in differences[:self.top_allocations] if d.size_diff > 0]
+
+        self.stages.append({
+            'name': current['name'],
+            'wall_seconds': round(wall, 3),
+            'rss_mb': round(rss, 1) if rss is not None else None,
+            'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None,
+            # Without clear_refs the peak is the process-lifetime high-water mark
+            'peak_rss_scope': 'stage' if current['per_stage_rss'] else 'process',
+            'traced_peak_mb': round(traced_peak / 1e6, 1),
+            'top_allocations': top,
+        })
+
+    def _write(self):
+        with open(self.report_path + '.tmp', 'w') as f:
+            json.dump(self.report, f, indent=2)
+        os.replace(self.report_path + '.tmp', self.report_path)
@@ -0,0 +1,130 @@
+import json
+import re
+
+import numpy as np
+
+LOOKUP_FILE = 'short_text_lookup.json'
+# Texts longer than MAX_CHARS skip the lookup without being tokenized
+MAX_WORDS = 4
+MAX_CHARS = 64
+# Negations flip a phrase, so they are never dropped as filler and only count inside a bigram
+NEGATIONS = frozenset(['not', 'no', 'never', 'nor', 'none', 'nothing', 'cannot', 'without', 'hardly', 'barely'])
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+
+def phrase_tokens(text, fillers):
+    """Lowercase letter-only tokens of text without filler words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in fillers]
+
+
+def keep_pure(counts, min_count, min_purity, alpha, confirmed=()):
+    """{key: [label, confidence]} for keys seen min_count times (or confirmed) with one label in min_purity of them"""
+    table = {}
+    for key, class_counts in counts.items():
+        total = class_counts.sum()
+        label = int(class_counts.argmax())
+        if (total >= min_count or (key, label) in confirmed) and class_counts[label] / total >= min_purity:
+            confidence = (class_counts[label] + alpha) / (total + alpha * len(class_counts))
+            table[key] = [label, round(float(confidence), 4)]
+    return table
+
+
+def build_lookup(texts, labels, fillers, model_labels=None, n_classes=3, max_words=MAX_WORDS, min_purity=0.9,
+                 min_exact_count=2, min_ngram_count=3, alpha=0.1):
+    """Exact-phrase and uni/bigram label tables from the labeled texts of at most max_words words
+
+    Deduplicated training data holds most phrases once, so a phrase seen fewer than
+    min_exact_count times is only kept where model_labels (the trained model's
+    predictions for texts) agree with its label.
+    """
+    fillers = frozenset(fillers) - NEGATIONS
+    if model_labels is None:
+        model_labels = [None] * len(texts)
+    exact, ngrams, confirmed = {}, {}, set()
+    for text, label, model_label in zip(texts, labels, model_labels):
+        tokens = phrase_tokens(text, fillers)
+        if not tokens or len(tokens) > max_words:
+            continue
+        phrase = ' '.join(tokens)
+        exact.setdefault(phrase, np.zeros(n_classes))[label] += 1
+        if model_label == label:
+            confirmed.add((phrase, label))
+        grams = set(tokens) | {' '.join(tokens[i:i + 2]) for i in range(len(tokens) - 1)}
+        for gram in grams:
+            ngrams.setdefault(gram, np.zeros(n_classes))[label] += 1
+
+    return {
+        'max_words': max_words,
+        'max_chars': MAX_CHARS,
+        'fillers': sorted(fillers),
+        'exact': keep_pure(exact, min_exact_count, min_purity, alpha, confirmed),
+        'ngrams': keep_pure(ngrams, min_ngram_count, min_purity, alpha),
+    }
+
+
+class ShortTextLookup:
+    """Label lookup for short texts: exact phrase first, then a unanimous uni/bigram cover"""
+
+    def __init__(self, table):
+        self.max_words = table['max_words']
+        self.max_chars = table['max_chars']
+        self.fillers = frozenset(table['fillers'])
+        self.exact = {key: tuple(value) for key, value in table['exact'].items()}
+        self.ngrams = {key: tuple(value) for key, value in table['ngrams'].items()}
+
+    def lookup(self, text):
+        """(label, confidence, stage) for a covered text, or None to fall back to the model"""
+        if len(text) > self.max_chars:
+            return None
+        tokens = phrase_tokens(text, self.fillers)
+        if not tokens or len(tokens) > self.max_words:
+            return None
+
+        hit = self.exact.get(' '.join(tokens))
+        if hit is not None:
+            return hit[0], hit[1], 'short_exact'
+
+        # Cover the tokens left to right with known n-grams, preferring bigrams;
+        # any uncovered token (unseen word, other language, bare negation) means no answer
+        matches, i = [], 0
+        while i < len(tokens):
+            hit = self.ngrams.get(' '.join(tokens[i:i + 2])) if i + 1 < len(tokens) else None
+            if hit is not None:
+                i += 2
+            elif tokens[i] not in NEGATIONS and tokens[i] in self.ngrams:
+                hit = self.ngrams[tokens[i]]
+                i += 1
+            else:
+                return None
+            matches.append(hit)
+
+        labels = {label for label, _ in matches}
+        if len(labels) != 1:
+            return None
+        return labels.pop(), min(confidence for _, confidence in matches), 'short_ngram'
+
+    def lookup_many(self, texts):
+        """Row indices, labels, confidences and stages of the covered texts"""
+        rows, labels, confidences, stages = [], [], [], []
+        for row, text in enumerate(texts):
+            hit = self.lookup(text)
+            if hit is not None:
+                rows.append(row)
+                labels.append(hit[0])
+                confidences.append(hit[1])
+                stages.append(hit[2])
+        return rows, labels, confidences, stages
+
+
+def save_lookup(path, table):
+    with open(path, 'w') as f:
+        json.dump(table, f)
+
+
+def load_lookup(path):
+    """ShortTextLookup from a saved table, or None if there is none"""
+    try:
+        with open(path) as f:
+            return ShortTextLookup(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
@@ -0,0 +1,37 @@
+import os
+import numpy as np
+
+FEATURE_DTYPES = {'float32': np.float32, 'float64': np.float64}
+# Largest probability difference accepted between the float32 path and the float64 reference
+FEATURE_TOLERANCE = 1e-4
+
+
+def feature_dtype(name=None):
+    """Feature matrix dtype from name or SENTIMENT_FEATURE_DTYPE (float32 by default)"""
+    name = name or os.environ.get('SENTIMENT_FEATURE_DTYPE', 'float32')
+    if name not in FEATURE_DTYPES:
+        raise ValueError(f"Unsupported feature dtype {name!r}; use one of {sorted(FEATURE_DTYPES)}")
+    return FEATURE_DTYPES[name]
+
+
+def compact_sparse(X, dtype=np.float32):
+    """CSR copy-free where possible, with data in dtype and int32 indices/indptr when they fit"""
+    X = X.tocsr()
+    X.data = X.data.astype(dtype, copy=False)
+    if X.nnz <= np.iinfo(np.int32).max and X.shape[1] <= np.iinfo(np.int32).max:
+        X.indices = X.indices.astype(np.int32, copy=False)
+        X.indptr = X.indptr.astype(np.int32, copy=False)
+    return X
+
+
+def sparse_nbytes(X):
+    """Bytes held by a CSR matrix's data, indices and indptr arrays"""
+    return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+
+
+def compare_outputs(model, X, reference_model, reference_X):
+    """(max probability difference, label agreement) of model on X against a reference"""
+    probabilities = model.predict_proba(X)
+    reference = reference_model.predict_proba(reference_X)
+    agreement = (probabilities.argmax(axis=1) == reference.argmax(axis=1)).mean()
+    return float(np.abs(probabilities - reference).max()), float(agreement)
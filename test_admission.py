@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'api'))
+
+from admission import AdmissionPool
+
+
+def test_admission_pool_queues_then_sheds():
+    pool = AdmissionPool('batch', max_active=1, max_queued=1, queue_timeout=5)
+    assert pool.acquire()
+
+    # The second request waits for the slot, the third finds the queue full
+    outcomes = []
+    waiter = threading.Thread(target=lambda: outcomes.append(pool.acquire()))
+    waiter.start()
+    while pool.queued == 0:
+        time.sleep(0.01)
+    assert not pool.acquire()
+
+    pool.release(0.5)
+    waiter.join()
+    assert outcomes == [True]
+    stats = pool.stats()
+    assert (stats['active'], stats['queued'], stats['peak_queued']) == (1, 0, 1)
+    assert (stats['admitted'], stats['rejected'], stats['timed_out']) == (2, 1, 0)
+    assert pool.retry_after() == 1
+
+    # A queued request gives up after queue_timeout
+    pool.queue_timeout = 0.05
+    assert not pool.acquire()
+    assert pool.stats()['timed_out'] == 1 and pool.queued == 0
+
+
+def test_background_work_yields_to_queued_requests():
+    pool = AdmissionPool('batch', max_active=1, max_queued=1, queue_timeout=5)
+    assert pool.acquire()
+
+    order = []
+    background = threading.Thread(target=lambda: (pool.acquire_background(), order.append('job')))
+    background.start()
+    while pool.background_waiting == 0:
+        time.sleep(0.01)
+    request = threading.Thread(target=lambda: (pool.acquire(), order.append('request')))
+    request.start()
+    while pool.queued == 0:
+        time.sleep(0.01)
+
+    # The queued request takes the freed slot; the job chunk runs after it
+    pool.release(0.1)
+    request.join()
+    assert order == ['request'] and pool.stats()['background_waiting'] == 1
+    pool.release(0.1)
+    background.join()
+    assert order == ['request', 'job'] and pool.stats()['background_admitted'] == 1
+
+    # Job chunks do not feed the service time that Retry-After is estimated from
+    pool.release_background()
+    assert pool.stats()['active'] == 0 and pool.stats()['service_time_ms'] == 100.0
+
+
+if __name__ == "__main__":
+    test_admission_pool_queues_then_sheds()
+    test_background_work_yields_to_queued_requests()
+    print("Admission tests passed")
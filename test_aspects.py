@@ -0,0 +1,23 @@
+from aspects import find_aspect_windows, group_aspects
+
+
+def test_aspect_windows_follow_clauses():
+    texts = [
+        "The nurses were kind, but the wait time was terrible. Billing charged me twice!",
+        "Great",
+        "The waiting room was dirty and the side-effects of the medication were awful",
+    ]
+    rows, aspects, windows, mentions = find_aspect_windows(texts)
+
+    assert rows == [0, 0, 0, 2, 2]
+    assert aspects == ['staff', 'wait_time', 'billing', 'facility', 'medication_side_effects']
+    assert windows[:3] == ["The nurses were kind,", "the wait time was terrible", "Billing charged me twice"]
+    assert mentions[4] == ['medication', 'side effects']
+
+    grouped = group_aspects(len(texts), rows, aspects, mentions, ['positive'] * 5, [0.9] * 5)
+    assert [len(g) for g in grouped] == [3, 0, 2]
+
+
+if __name__ == "__main__":
+    test_aspect_windows_follow_clauses()
+    print("Aspect tests passed")
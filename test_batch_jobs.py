@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'api'))
+
+from batch_jobs import JobManager
+
+
+class Upload:
+    """Stand-in for a werkzeug FileStorage"""
+
+    def __init__(self, content, filename='reviews.csv'):
+        self.content = content
+        self.filename = filename
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write(self.content)
+
+
+def predict(texts):
+    return ['positive'] * len(texts), [0.9] * len(texts), ['model'] * len(texts)
+
+
+def test_job_results_are_paged_across_chunks():
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        manager = JobManager(jobs_dir, predict, chunk_rows=2)
+        manager._ensure_workers = lambda: None
+        job_id, error = manager.submit(Upload("review\n" + "".join(f"review {i}\n" for i in range(5))))
+        assert error is None and manager.status(job_id)['state'] == 'queued'
+        manager._run(job_id)
+
+        status = manager.status(job_id)
+        assert status['state'] == 'completed' and status['chunks'] == [2, 2, 1]
+        assert status['progress'] == 1.0 and status['summary']['positive'] == 5
+        page = manager.results(job_id, offset=1, limit=3)
+        assert page['complete'] and page['available'] == 5
+        assert [row['text'] for row in page['results']] == ['review 1', 'review 2', 'review 3']
+        assert [row['id'] for row in manager.results(job_id, offset=4, limit=10)['results']] == [5]
+
+
+def test_cancelled_jobs_never_end_completed():
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        manager = JobManager(jobs_dir, predict, chunk_rows=2)
+        manager._ensure_workers = lambda: None
+
+        # Cancelled while queued, including a CSV with no data rows
+        for content in ("review\ngreat care\n", "review\n"):
+            job_id = manager.submit(Upload(content))[0]
+            assert manager.cancel(job_id)['cancel_requested']
+            manager._run(job_id)
+            assert manager.status(job_id)['state'] == 'cancelled'
+
+        # Cancelled while the last chunk is being scored
+        def cancel_during_predict(texts):
+            manager.cancel(job_id)
+            return predict(texts)
+        manager.predict = cancel_during_predict
+        job_id = manager.submit(Upload("review\ngreat care\n"))[0]
+        manager._run(job_id)
+        assert manager.status(job_id)['state'] == 'cancelled'
+        assert manager.status(job_id)['processed_rows'] == 1
+
+
+def test_finished_jobs_are_deleted_and_swept():
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        manager = JobManager(jobs_dir, predict, ttl_seconds=3600)
+        manager._ensure_workers = lambda: None  # jobs are run synchronously below
+        finished, queued, old = (manager.submit(Upload("review\ngreat care\nkind staff\n"))[0] for _ in range(3))
+        manager._run(finished)
+        manager._run(old)
+        assert manager.status(finished)['state'] == 'completed'
+
+        # Queued and running jobs are never removed
+        assert manager.delete(queued) is False
+        assert manager.delete(finished) is True and manager.status(finished) is None
+        assert manager.delete(finished) is None
+
+        assert manager.sweep() == 0
+        assert manager.sweep(now=time.time() + 7200) == 1
+        assert manager.status(old) is None and manager.status(queued)['state'] == 'queued'
+
+
+if __name__ == "__main__":
+    test_job_results_are_paged_across_chunks()
+    test_cancelled_jobs_never_end_completed()
+    test_finished_jobs_are_deleted_and_swept()
+    print("Batch job tests passed")
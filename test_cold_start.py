@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from compact_model import export_compact_model
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'api')
+
+# Budgets for a serverless cold start that finds sentiment_model.npz
+IMPORT_BUDGET_SECONDS = 1.0
+FIRST_REQUEST_BUDGET_SECONDS = 0.25
+HEAVY_MODULES = ['sklearn', 'pandas', 'joblib', 'scipy']
+
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import index
+imported = time.perf_counter()
+client = index.app.test_client()
+client.get('/api/health')
+response = client.post('/api/analyze', json={'text': 'The doctor was caring and helpful'})
+answered = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'first_request_seconds': answered - imported,
+    'status': response.status_code,
+    'model_used': response.get_json()['model_used'],
+    'heavy_modules': [m for m in %r if m in sys.modules],
+}))
+""" % HEAVY_MODULES
+
+
+def build_compact_artifact(directory):
+    """Fit a tiny vectorizer + NB model and export it as the compact serving artifact"""
+    texts = [
+        "great caring doctor", "excellent helpful staff", "clean modern facility",
+        "rude staff long wait", "terrible billing problems", "dirty room poor care",
+        "average standard visit", "routine appointment okay", "typical normal checkup",
+    ]
+    labels = [1, 1, 1, 0, 0, 0, 2, 2, 2]
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3), sublinear_tf=True)
+    model = MultinomialNB(alpha=0.5).fit(vectorizer.fit_transform(texts), labels)
+    export_compact_model(os.path.join(directory, 'sentiment_model.npz'), vectorizer, model)
+
+
+def measure_cold_start(model_dir):
+    """Import the API in a fresh interpreter and time the import and the first requests"""
+    env = dict(os.environ, SENTIMENT_MODEL_DIR=model_dir, SENTIMENT_INFERENCE_MODE='model')
+    output = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT], cwd=API_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_cold_start_budget():
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_compact_artifact(model_dir)
+        measure_cold_start(model_dir)  # warm the OS file cache like a reused container
+        result = measure_cold_start(model_dir)
+
+    assert result['status'] == 200
+    assert result['model_used'] == 'trained_model'
+    assert result['heavy_modules'] == [], f"Cold start imported {result['heavy_modules']}"
+    assert result['import_seconds'] < IMPORT_BUDGET_SECONDS, result
+    assert result['first_request_seconds'] < FIRST_REQUEST_BUDGET_SECONDS, result
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_compact_artifact(model_dir)
+        measure_cold_start(model_dir)
+        result = measure_cold_start(model_dir)
+    print(f"Import time: {result['import_seconds'] * 1000:.0f} ms (budget {IMPORT_BUDGET_SECONDS * 1000:.0f} ms)")
+    print(f"First request: {result['first_request_seconds'] * 1000:.0f} ms (budget {FIRST_REQUEST_BUDGET_SECONDS * 1000:.0f} ms)")
+    print(f"Heavy modules imported: {result['heavy_modules'] or 'none'}")
@@ -0,0 +1,28 @@
+import pandas as pd
+from deduplication import find_near_duplicates, drop_near_duplicates
+
+
+def test_template_variations_collapse():
+    texts = [
+        "The doctor was very professional and caring during my visit",
+        "Overall, the doctor was very professional and caring during my visit today.",
+        "Billing issues and unclear pricing information",
+        "Great",
+        "Great service",
+        "Great",
+    ]
+    assert find_near_duplicates(texts).tolist() == [0, 0, 2, 3, 4, 3]
+
+
+def test_labels_keep_opposite_copies():
+    df = pd.DataFrame({
+        'processed_review': ["the staff was very helpful", "the staff was very helpful!", "the staff was very helpful"],
+        'sentiment': ['positive', 'positive', 'negative'],
+    })
+    assert drop_near_duplicates(df, 'processed_review', 'sentiment').index.tolist() == [0, 2]
+
+
+if __name__ == "__main__":
+    test_template_variations_collapse()
+    test_labels_keep_opposite_copies()
+    print("Deduplication tests passed")
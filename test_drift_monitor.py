@@ -0,0 +1,32 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from drift_monitor import DriftMonitor, Sketch
+
+
+def test_drift_is_flagged_against_baseline():
+    reviews = ["The nurse was kind and the doctor explained everything clearly",
+               "Long wait and rude staff at the front desk",
+               "Average visit, nothing special"] * 100
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words='english').fit(reviews)
+    codes, confidences = [1, 0, 2] * 100, [0.9, 0.8, 0.6] * 100
+
+    baseline = DriftMonitor(vectorizer).sketch(reviews, codes, confidences)
+    assert baseline.oov_rate() == 0.0
+    assert Sketch.from_dict(baseline.to_dict()).to_dict() == baseline.to_dict()
+
+    monitor = DriftMonitor(vectorizer, baseline, window_size=250)
+    monitor.update(reviews, codes, confidences)
+    report = monitor.report()
+    assert report['comparison']['status'] == 'ok'
+    assert report['recent']['texts'] == 300 and report['lifetime']['texts'] == 300
+
+    # Unseen vocabulary, short texts and uncertain negatives in the next window
+    monitor.update(["Das Wartezimmer war schmutzig"] * 300, [0] * 300, [0.4] * 300)
+    comparison = monitor.report()['comparison']
+    assert comparison['status'] == 'drift'
+    assert set(comparison['drifted']) == {'length_psi', 'class_psi', 'confidence_psi', 'oov_rise'}
+
+
+if __name__ == "__main__":
+    test_drift_is_flagged_against_baseline()
+    print("Drift monitor tests passed")
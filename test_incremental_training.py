@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from incremental_training import build_state, fold_in, vocabulary_drift
+
+TRAIN_TEXTS = [
+    "great caring doctor", "excellent helpful staff", "clean modern facility",
+    "rude staff long wait", "terrible billing problems", "dirty room poor care",
+    "average standard visit", "routine appointment okay", "typical normal checkup",
+]
+TRAIN_LABELS = [1, 1, 1, 0, 0, 0, 2, 2, 2]
+NEW_TEXTS = ["helpful doctor clean room", "long wait billing problems", "okay visit"]
+NEW_LABELS = [1, 0, 2]
+
+
+def test_fold_in_matches_full_idf():
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), sublinear_tf=True)
+    model = MultinomialNB(alpha=0.5).fit(vectorizer.fit_transform(TRAIN_TEXTS), TRAIN_LABELS)
+    state = build_state(vectorizer, TRAIN_TEXTS, NEW_TEXTS)
+
+    fold_in(state, vectorizer, [model], NEW_TEXTS, NEW_LABELS)
+
+    # Same vocabulary refitted on the whole history gives the same IDF weights
+    full = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), sublinear_tf=True,
+                           vocabulary=vectorizer.vocabulary_).fit(TRAIN_TEXTS + NEW_TEXTS)
+    assert np.allclose(vectorizer.idf_, full.idf_)
+    assert model.class_count_.tolist() == [4, 4, 4]
+    assert vocabulary_drift(state) < 1e-12
+
+
+def test_unseen_vocabulary_raises_drift():
+    vectorizer = TfidfVectorizer(stop_words='english').fit(TRAIN_TEXTS)
+    model = MultinomialNB().fit(vectorizer.transform(TRAIN_TEXTS), TRAIN_LABELS)
+    state = build_state(vectorizer, TRAIN_TEXTS, TRAIN_TEXTS)
+
+    drift = fold_in(state, vectorizer, [model], ["telehealth portal login glitch"], [0])
+    assert drift == 1.0
+
+
+if __name__ == "__main__":
+    test_fold_in_matches_full_idf()
+    test_unseen_vocabulary_raises_drift()
+    print("Incremental training tests passed")
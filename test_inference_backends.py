@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import ComplementNB
+
+from calibration import fit_calibration
+from compact_model import export_compact_model, pickle_fingerprint
+from data_generation import generate_chunk
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_artifacts(directory):
+    """Train a small calibrated NB model on generated reviews and write every serving artifact"""
+    reviews = generate_chunk(np.random.default_rng(0), 600, np.full(3, 1 / 3), np.array([0.5, 0.5]))
+    labels = reviews['sentiment'].map({'negative': 0, 'positive': 1, 'neutral': 2}).to_numpy()
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3), sublinear_tf=True, dtype=np.float32)
+    X = vectorizer.fit_transform(reviews['review'])
+    model = ComplementNB(alpha=0.5).fit(X, labels)
+    calibration = fit_calibration(model.predict_proba(X), labels, model.classes_)
+
+    joblib.dump(model, os.path.join(directory, 'sentiment_model.pkl'))
+    joblib.dump(vectorizer, os.path.join(directory, 'tfidf_vectorizer.pkl'))
+    joblib.dump(calibration, os.path.join(directory, 'calibration.pkl'))
+    fingerprint = pickle_fingerprint(os.path.join(directory, 'sentiment_model.pkl'),
+                                     os.path.join(directory, 'tfidf_vectorizer.pkl'))
+    export_compact_model(os.path.join(directory, 'sentiment_model.npz'), vectorizer, model, calibration,
+                         fingerprint=fingerprint)
+
+
+def test_backends_match_reference():
+    # A fresh interpreter, so the API module loads this model directory rather than the repository's
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_artifacts(model_dir)
+        result = subprocess.run([sys.executable, 'inference_benchmark.py', '--model-dir', model_dir,
+                                 '--rows', '300', '--repeat', '1'], cwd=ROOT_DIR, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    for backend in ('sklearn batch', 'compact batch', 'compact per row', 'api score_codes', 'api per row'):
+        assert f"{backend} " in result.stdout, result.stdout
+
+
+if __name__ == "__main__":
+    test_backends_match_reference()
+    print("Inference backend tests passed")
@@ -1,6 +1,39 @@
 import joblib
 import pandas as pd
 
+# Test regular reviews
+TEST_REVIEWS = [
+    "The doctor was very professional and caring. Great experience!",
+    "Terrible service, long wait times and rude staff.",
+    "The hospital was clean and the nurses were helpful.",
+    "I had to wait for hours and the treatment was ineffective.",
+    "The medical staff was knowledgeable and the facility was modern."
+]
+
+# Test short positive reviews (the problematic ones)
+SHORT_POSITIVE_REVIEWS = [
+    "I really enjoyed",
+    "I really enjoyed the experience",
+    "Great service",
+    "Excellent care",
+    "Amazing doctor",
+    "Wonderful experience",
+    "Best hospital ever",
+    "Love this place",
+    "Fantastic treatment",
+    "Outstanding care",
+    "Perfect experience",
+    "Highly recommend",
+    "Very satisfied",
+    "Great experience",
+    "Excellent service",
+    "Amazing staff",
+    "Wonderful care",
+    "Best experience",
+    "Love the staff",
+    "Fantastic service"
+]
+
 def load_model():
     """Load the trained model and vectorizer"""
     try:
@@ -30,47 +63,14 @@ def main():
     print("HEALTHCARE SENTIMENT ANALYSIS")
     print("="*50)
     
-    # Test regular reviews
-    test_reviews = [
-        "The doctor was very professional and caring. Great experience!",
-        "Terrible service, long wait times and rude staff.",
-        "The hospital was clean and the nurses were helpful.",
-        "I had to wait for hours and the treatment was ineffective.",
-        "The medical staff was knowledgeable and the facility was modern."
-    ]
-    
     print("\nTesting regular reviews:")
     print("-" * 50)
-    for i, review in enumerate(test_reviews, 1):
+    for i, review in enumerate(TEST_REVIEWS, 1):
         sentiment, confidence = predict_sentiment(review, model, vectorizer)
         print(f"{i}. Review: {review}")
         print(f"   Sentiment: {sentiment} (Confidence: {confidence:.1f}%)")
         print()
     
-    # Test short positive reviews (the problematic ones)
-    short_positive_reviews = [
-        "I really enjoyed",
-        "I really enjoyed the experience",
-        "Great service",
-        "Excellent care",
-        "Amazing doctor",
-        "Wonderful experience",
-        "Best hospital ever",
-        "Love this place",
-        "Fantastic treatment",
-        "Outstanding care",
-        "Perfect experience",
-        "Highly recommend",
-        "Very satisfied",
-        "Great experience",
-        "Excellent service",
-        "Amazing staff",
-        "Wonderful care",
-        "Best experience",
-        "Love the staff",
-        "Fantastic service"
-    ]
-    
     print("\nTesting short positive reviews (previously problematic):")
     print("-" * 50)
     
@@ -78,7 +78,7 @@ def main():
     neutral_count = 0
     negative_count = 0
     
-    for i, review in enumerate(short_positive_reviews, 1):
+    for i, review in enumerate(SHORT_POSITIVE_REVIEWS, 1):
         sentiment, confidence = predict_sentiment(review, model, vectorizer)
         print(f"{i:2d}. Review: '{review}'")
         print(f"    Sentiment: {sentiment} (Confidence: {confidence:.1f}%)")
@@ -92,9 +92,9 @@ def main():
     
     print("\n" + "="*50)
     print("SHORT POSITIVE REVIEWS SUMMARY:")
-    print(f"✅ Correctly classified as Positive: {positive_count}/{len(short_positive_reviews)} ({positive_count/len(short_positive_reviews)*100:.1f}%)")
-    print(f"⚠️  Misclassified as Neutral: {neutral_count}/{len(short_positive_reviews)} ({neutral_count/len(short_positive_reviews)*100:.1f}%)")
-    print(f"❌ Misclassified as Negative: {negative_count}/{len(short_positive_reviews)} ({negative_count/len(short_positive_reviews)*100:.1f}%)")
+    print(f"✅ Correctly classified as Positive: {positive_count}/{len(SHORT_POSITIVE_REVIEWS)} ({positive_count/len(SHORT_POSITIVE_REVIEWS)*100:.1f}%)")
+    print(f"⚠️  Misclassified as Neutral: {neutral_count}/{len(SHORT_POSITIVE_REVIEWS)} ({neutral_count/len(SHORT_POSITIVE_REVIEWS)*100:.1f}%)")
+    print(f"❌ Misclassified as Negative: {negative_count}/{len(SHORT_POSITIVE_REVIEWS)} ({negative_count/len(SHORT_POSITIVE_REVIEWS)*100:.1f}%)")
     
     if neutral_count == 0 and negative_count == 0:
         print("\n🎉 PERFECT! All short positive reviews correctly classified!")
@@ -0,0 +1,44 @@
+import tempfile
+
+from pipeline import StageCache, apply_overrides
+
+
+def test_stage_cache_reruns_only_changed_stages():
+    calls = []
+
+    def stage(name, value):
+        calls.append(name)
+        return value
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for alpha in (0.5, 0.5, 0.3):
+            cache = StageCache(cache_dir)
+            data_key, data = cache.run('data', {'rows': 3}, [], lambda: stage('data', [1, 2, 3]))
+            fit_key, fit = cache.run('fit', {'alpha': alpha}, [data_key], lambda: stage('fit', sum(data) * alpha))
+        assert calls == ['data', 'fit', 'fit'] and fit == 6 * 0.3
+
+        # None is not cached; forced stages run again
+        cache = StageCache(cache_dir, force=['data'])
+        cache.run('data', {'rows': 3}, [], lambda: stage('data', [1, 2, 3]))
+        cache.run('missing', {}, [], lambda: stage('missing', None))
+        cache.run('missing', {}, [], lambda: stage('missing', None))
+        assert calls[3:] == ['data', 'missing', 'missing']
+
+
+def test_apply_overrides():
+    config = {'models': {'RandomForest': {'n_estimators': 200, 'class_weight': 'balanced'}}}
+    apply_overrides(config, ['models.RandomForest.n_estimators=50', 'models.RandomForest.class_weight=null'])
+    assert config['models']['RandomForest'] == {'n_estimators': 50, 'class_weight': None}
+
+    for bad in ('models.Unknown.alpha=1', 'models.RandomForest.depth=3', 'models.RandomForest.n_estimators'):
+        try:
+            apply_overrides(config, [bad])
+            assert False, bad
+        except (KeyError, ValueError):
+            pass
+
+
+if __name__ == "__main__":
+    test_stage_cache_reruns_only_changed_stages()
+    test_apply_overrides()
+    print("Pipeline tests passed")
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import ComplementNB, MultinomialNB
+
+from compact_model import artifact_sizes, export_compact_model, load_compact_model, QuantizedNB
+from data_generation import generate_chunk
+
+
+def test_quantized_artifacts_track_float_model():
+    reviews = generate_chunk(np.random.default_rng(1), 600, np.full(3, 1 / 3), np.array([0.5, 0.5]))
+    labels = reviews['sentiment'].map({'negative': 0, 'positive': 1, 'neutral': 2}).to_numpy()
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3), sublinear_tf=True)
+    X = vectorizer.fit_transform(reviews['review'])
+
+    with tempfile.TemporaryDirectory() as directory:
+        for model in (ComplementNB(alpha=0.5).fit(X, labels), MultinomialNB(alpha=0.5).fit(X, labels)):
+            path = lambda name: os.path.join(directory, name)
+            export_compact_model(path('float.npz'), vectorizer, model)
+            float_bytes, _ = artifact_sizes(path('float.npz'))
+            for bits, tolerance in ((8, 0.05), (16, 1e-3)):
+                export_compact_model(path(f'int{bits}.npz'), vectorizer, model, quantize_bits=bits)
+                compact_vectorizer, quantized, _ = load_compact_model(path(f'int{bits}.npz'))
+                assert isinstance(quantized, QuantizedNB)
+                assert quantized.quantized_log_prob_.dtype == np.dtype(f'int{bits}')
+                # Raw array bytes, so the file compression of the quantized artifacts does not count:
+                # at least the log-probabilities shrink from 64 to `bits` bits per weight
+                quantized_bytes, _ = artifact_sizes(path(f'int{bits}.npz'))
+                assert float_bytes - quantized_bytes >= model.feature_log_prob_.nbytes * (1 - bits / 64)
+
+                Xq = compact_vectorizer.transform(reviews['review'])
+                assert (quantized.predict(Xq) == model.predict(X)).mean() > 0.99
+                assert np.abs(quantized.predict_proba(Xq) - model.predict_proba(X)).max() < tolerance
+
+
+if __name__ == "__main__":
+    test_quantized_artifacts_track_float_model()
+    print("Quantized model tests passed")
@@ -0,0 +1,31 @@
+from short_text import build_lookup, ShortTextLookup
+
+FILLERS = ['the', 'was', 'very', 'is', 'a']
+
+
+def test_short_text_lookup_covers_and_falls_back():
+    texts = ["Great service", "great service!", "Very rude staff", "rude nurse", "rude doctor",
+             "friendly nurse", "friendly doctor", "friendly staff", "A long story about a visit that went fine"]
+    labels = [1, 1, 0, 0, 0, 1, 1, 1, 2]
+    # Phrases seen once are only trusted where the model agreed with their label
+    model_labels = [1, 1, 0, 0, 2, 1, 1, 1, 2]
+    lookup = ShortTextLookup(build_lookup(texts, labels, FILLERS, model_labels, min_ngram_count=2))
+
+    assert lookup.lookup("great service") == (1, 0.913, 'short_exact')
+    assert lookup.lookup("rude nurse") == (0, 0.8462, 'short_exact')
+    assert lookup.lookup("The service was GREAT") == (1, 0.913, 'short_ngram')
+    assert lookup.lookup("rude, very rude doctor") is None  # 'doctor' is shared by both classes
+    assert lookup.lookup("rude, very rude") == (0, 0.9394, 'short_ngram')
+    # Unseen words, mixed evidence, bare negations and long texts go to the model
+    assert lookup.lookup("rude but friendly") is None
+    assert lookup.lookup("not friendly") is None
+    assert lookup.lookup("sehr freundlich") is None
+    assert lookup.lookup("friendly " * 20) is None
+
+    rows, labels, _, stages = lookup.lookup_many(["great service", "sehr gut", "friendly nurse"])
+    assert rows == [0, 2] and labels == [1, 1] and stages == ['short_exact', 'short_exact']
+
+
+if __name__ == "__main__":
+    test_short_text_lookup_covers_and_falls_back()
+    print("Short text lookup tests passed")
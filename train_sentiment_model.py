@@ -1,266 +1,565 @@
+import argparse
+import copy
+import os
+import pickle
+import sys
+import time
+from collections import Counter
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, ENGLISH_STOP_WORDS
 from sklearn.naive_bayes import ComplementNB, MultinomialNB
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import numpy as np
-from data_preparation import combine_datasets
+from data_preparation import load_healthcare_data, load_drug_reviews_data, combine_frames
 from sklearn.utils import resample
-from collections import Counter
-
-# Load and combine datasets
-print("Loading and combining datasets...")
-df = combine_datasets()
-
-if df is None:
-    print("No data available. Please check your data files.")
-    exit()
-
-# Clean the data - remove NaN values
-print("Cleaning data...")
-df = df.dropna(subset=['processed_review'])
-df = df[df['processed_review'].str.strip() != '']
-print(f"After cleaning: {df.shape}")
-
-# Add short positive examples to improve short text classification
-print("Adding short positive examples for better short text handling...")
-short_positive_examples = [
-    "Great service",
-    "Excellent care", 
-    "Amazing doctor",
-    "Wonderful experience",
-    "Best hospital",
-    "Love this place",
-    "Fantastic treatment",
-    "Outstanding care",
-    "Perfect experience",
-    "Highly recommend",
-    "Very satisfied",
-    "Great experience",
-    "Excellent service",
-    "Amazing staff",
-    "Wonderful care",
-    "Best experience",
-    "Love the staff",
-    "Fantastic service",
-    "I really enjoyed",
-    "I really enjoyed the experience",
-    "Great",
-    "Excellent",
-    "Amazing",
-    "Wonderful",
-    "Best",
-    "Love it",
-    "Fantastic",
-    "Outstanding",
-    "Perfect",
-    "Highly recommend",
-    "Very satisfied",
-    "Great experience",
-    "Excellent service",
-    "Amazing staff",
-    "Wonderful care",
-    "Best experience",
-    "Love the staff",
-    "Fantastic service"
-]
-
-# Create DataFrame for short positive examples
-short_pos_df = pd.DataFrame({
-    'processed_review': short_positive_examples,
-    'sentiment': ['positive'] * len(short_positive_examples)
-})
-
-# Add to main dataset
-df = pd.concat([df, short_pos_df], ignore_index=True)
-print(f"After adding short examples: {df.shape}")
-
-# Map sentiments to labels
-sentiment_mapping = {
-    'positive': 1,
-    'negative': 0,
-    'neutral': 2
+from calibration import fit_calibration, apply_calibration, expected_calibration_error
+from cascade import score_stage, tune_cascade_threshold, predict_cascade
+from forest_compaction import CompactForest
+from compact_model import artifact_sizes, export_compact_model, load_compact_model, pickle_fingerprint, QUANTIZED_DTYPES, QUANTIZED_FILE
+from feature_selection import rank_features, prune_vectorizer, prune_model, select_feature_count
+from incremental_training import build_state, STATE_FILE, HISTORY_FILE
+from deduplication import drop_near_duplicates
+from sparse_features import feature_dtype, compact_sparse, sparse_nbytes, compare_outputs, FEATURE_TOLERANCE
+from sklearn.base import clone
+from profiling import StageProfiler
+from drift_monitor import DriftMonitor, save_baseline, BASELINE_FILE
+from short_text import build_lookup, ShortTextLookup, phrase_tokens, save_lookup, LOOKUP_FILE, MAX_WORDS
+from pipeline import StageCache, file_digest, apply_overrides, DEFAULT_CACHE_DIR
+
+# Stage configuration. Every value is part of its stage's cache key, so changing e.g. a model
+# hyperparameter (--set models.RandomForest.n_estimators=300) re-runs only that fit and evaluate
+CONFIG = {
+    'prepare': {
+        # Short positive examples added to improve short text classification
+        'short_positive_examples': [
+            "Great service", "Excellent care", "Amazing doctor", "Wonderful experience", "Best hospital",
+            "Love this place", "Fantastic treatment", "Outstanding care", "Perfect experience",
+            "Highly recommend", "Very satisfied", "Great experience", "Excellent service", "Amazing staff",
+            "Wonderful care", "Best experience", "Love the staff", "Fantastic service", "I really enjoyed",
+            "I really enjoyed the experience", "Great", "Excellent", "Amazing", "Wonderful", "Best",
+            "Love it", "Fantastic", "Outstanding", "Perfect", "Highly recommend", "Very satisfied",
+            "Great experience", "Excellent service", "Amazing staff", "Wonderful care", "Best experience",
+            "Love the staff", "Fantastic service",
+        ],
+        'dedup_threshold': 0.5,
+    },
+    'split': {
+        'test_size': 0.2,
+        'validation_size': 0.15,  # of the training data, held out for calibration
+        'random_state': 42,
+    },
+    # Enhanced vectorizer with better short text handling
+    'vectorize': {
+        'max_features': 15000,  # Increased for better feature coverage
+        'lowercase': True,
+        'stop_words': 'english',
+        'ngram_range': [1, 3],  # Use unigrams, bigrams, and trigrams
+        'min_df': 1,            # Include all terms (even single occurrences)
+        'max_df': 0.95,         # Maximum document frequency
+        'sublinear_tf': True,   # Apply sublinear tf scaling
+        'analyzer': 'word',     # Word-based analysis
+        # float32 values with int32 indices halve the feature matrices (SENTIMENT_FEATURE_DTYPE=float64 to opt out)
+        'dtype': os.environ.get('SENTIMENT_FEATURE_DTYPE', 'float32'),
+    },
+    'models': {
+        # ComplementNB (better for imbalanced data); reduced alpha for better short text handling
+        'ComplementNB': {'alpha': 0.5},
+        # Random Forest with class weights
+        'RandomForest': {
+            'n_estimators': 200,
+            'class_weight': 'balanced',
+            'random_state': 42,
+            'max_depth': 15,
+            'min_samples_split': 5,
+            'min_samples_leaf': 2,
+        },
+        # MultinomialNB (original) with adjusted parameters
+        'MultinomialNB': {'alpha': 0.5},
+    },
+    'evaluate': {
+        # Candidate vocabulary sizes are n_features // divisor
+        'feature_divisors': [1, 2, 4, 8, 16, 32],
+    },
 }
-df['label'] = df['sentiment'].map(sentiment_mapping)
-
-# Prepare features and labels
-X = df['processed_review']
-y = df['label']
-
-print(f"Dataset shape: {df.shape}")
-print(f"Original sentiment distribution: {y.value_counts().to_dict()}")
-
-# Split the data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, 
-    test_size=0.2, 
-    random_state=42, 
-    stratify=y
-)
-
-print(f"Original training distribution: {Counter(y_train)}")
-
-# Handle class imbalance with oversampling
-train_df = pd.DataFrame({'processed_review': X_train, 'label': y_train})
-
-# Separate classes
-class_0 = train_df[train_df['label'] == 0]
-class_1 = train_df[train_df['label'] == 1]
-class_2 = train_df[train_df['label'] == 2]
-
-# Oversample minority classes to match majority (positive)
-majority_size = len(class_1)
-class_0_upsampled = resample(class_0, replace=True, n_samples=majority_size, random_state=42)
-class_2_upsampled = resample(class_2, replace=True, n_samples=majority_size, random_state=42)
-
-# Combine balanced dataset
-train_upsampled = pd.concat([class_0_upsampled, class_1, class_2_upsampled])
-X_train_upsampled = train_upsampled['processed_review']
-y_train_upsampled = train_upsampled['label']
-
-print(f"Upsampled training distribution: {Counter(y_train_upsampled)}")
-
-# Enhanced vectorizer with better short text handling
-vectorizer = TfidfVectorizer(
-    max_features=15000,  # Increased for better feature coverage
-    lowercase=True, 
-    stop_words='english',
-    ngram_range=(1, 3),   # Use unigrams, bigrams, and trigrams
-    min_df=1,             # Include all terms (even single occurrences)
-    max_df=0.95,          # Maximum document frequency
-    sublinear_tf=True,    # Apply sublinear tf scaling
-    analyzer='word'        # Word-based analysis
-)
-
-X_train_tfidf = vectorizer.fit_transform(X_train_upsampled)
-X_test_tfidf = vectorizer.transform(X_test)
-
-print(f"Vectorizer features: {X_train_tfidf.shape[1]}")
-
-# Train multiple models for comparison
-print("\nTraining models...")
-
-# 1. ComplementNB (better for imbalanced data)
-cnb_model = ComplementNB(alpha=0.5)  # Reduced alpha for better short text handling
-cnb_model.fit(X_train_tfidf, y_train_upsampled)
-
-# 2. Random Forest with class weights
-rf_model = RandomForestClassifier(
-    n_estimators=200,  # Increased for better performance
-    class_weight='balanced',
-    random_state=42,
-    max_depth=15,      # Increased depth
-    min_samples_split=5,
-    min_samples_leaf=2
-)
-rf_model.fit(X_train_tfidf, y_train_upsampled)
-
-# 3. MultinomialNB (original) with adjusted parameters
-mnb_model = MultinomialNB(alpha=0.5)  # Reduced alpha for better short text handling
-mnb_model.fit(X_train_tfidf, y_train_upsampled)
-
-# Evaluate all models
-from sklearn.metrics import accuracy_score, classification_report
-
-models = {
-    'ComplementNB': cnb_model,
-    'RandomForest': rf_model,
-    'MultinomialNB': mnb_model
-}
-
-best_model = None
-best_accuracy = 0
-
-print("\nModel Comparison:")
-print("=" * 50)
-
-for name, model in models.items():
-    y_pred = model.predict(X_test_tfidf)
-    accuracy = accuracy_score(y_test, y_pred)
-    
-    print(f"\n{name}:")
-    print(f"Accuracy: {accuracy:.4f}")
-    print("Classification Report:")
-    print(classification_report(y_test, y_pred, target_names=['Negative', 'Positive', 'Neutral']))
-    
-    if accuracy > best_accuracy:
-        best_accuracy = accuracy
-        best_model = model
-        best_model_name = name
-
-print(f"\nBest model: {best_model_name} (Accuracy: {best_accuracy:.4f})")
-
-# Save the best model and vectorizer
-joblib.dump(best_model, 'sentiment_model.pkl')
-joblib.dump(vectorizer, 'tfidf_vectorizer.pkl')
-
-print(f"\nModel trained and saved successfully!")
-print(f"Training samples: {len(X_train_upsampled)}")
-print(f"Testing samples: {len(X_test)}")
-print(f"Best model: {best_model_name}")
-print(f"Best accuracy: {best_accuracy:.4f}")
-
-# Test short positive reviews with the new model
-print("\n" + "="*60)
-print("TESTING SHORT POSITIVE REVIEWS WITH ENHANCED MODEL")
-print("="*60)
-
-short_test_reviews = [
-    "I really enjoyed",
-    "I really enjoyed the experience", 
-    "Great service",
-    "Excellent care",
-    "Amazing doctor",
-    "Wonderful experience",
-    "Best hospital ever",
-    "Love this place",
-    "Fantastic treatment",
-    "Outstanding care",
-    "Perfect experience",
-    "Highly recommend",
-    "Very satisfied",
-    "Great experience",
-    "Excellent service",
-    "Amazing staff",
-    "Wonderful care",
-    "Best experience",
-    "Love the staff",
-    "Fantastic service"
-]
-
-positive_count = 0
-neutral_count = 0
-negative_count = 0
-
-for i, review in enumerate(short_test_reviews, 1):
-    text_vectorized = vectorizer.transform([review])
-    prediction = best_model.predict(text_vectorized)[0]
-    probability = best_model.predict_proba(text_vectorized)[0]
-    
-    sentiment_map = {0: 'Negative', 1: 'Positive', 2: 'Neutral'}
-    sentiment = sentiment_map[prediction]
-    confidence = max(probability) * 100
-    
-    print(f"{i:2d}. Review: '{review}'")
-    print(f"    Sentiment: {sentiment} (Confidence: {confidence:.1f}%)")
-    
-    if sentiment == 'Positive':
-        positive_count += 1
-    elif sentiment == 'Neutral':
-        neutral_count += 1
+MODEL_CLASSES = {'ComplementNB': ComplementNB, 'RandomForest': RandomForestClassifier, 'MultinomialNB': MultinomialNB}
+STAGES = ['uci', 'prepare', 'split', 'vectorize'] + [f'fit {name}' for name in MODEL_CLASSES] + ['evaluate']
+SENTIMENT_MAPPING = {'positive': 1, 'negative': 0, 'neutral': 2}
+# Local inputs of the prepare stage; the UCI dataset is cached by its own stage
+DATA_FILES = ['healthcare_reviews_processed.csv', HISTORY_FILE]
+UCI_DATASET_ID = 461
+
+# Opt-in stage profiling: SENTIMENT_PROFILE=training_profile.json python train_sentiment_model.py
+profiler = StageProfiler()
+
+
+def prepare_data(config, drug_df):
+    """Combine, clean, extend and deduplicate the labeled reviews"""
+    df = combine_frames(load_healthcare_data(), drug_df)
+    if df is None:
+        raise FileNotFoundError("No data available. Please check your data files.")
+
+    profiler.stage('clean')
+    # Clean the data - remove NaN values
+    print("Cleaning data...")
+    df = df.dropna(subset=['processed_review'])
+    df = df[df['processed_review'].str.strip() != '']
+    print(f"After cleaning: {df.shape}")
+
+    # Add short positive examples to improve short text classification
+    print("Adding short positive examples for better short text handling...")
+    short_pos_df = pd.DataFrame({
+        'processed_review': config['short_positive_examples'],
+        'sentiment': ['positive'] * len(config['short_positive_examples'])
+    })
+    df = pd.concat([df, short_pos_df], ignore_index=True)
+    print(f"After adding short examples: {df.shape}")
+
+    # Collapse near-duplicate reviews (template variations, repeated examples) so copies of a
+    # training row cannot leak into the test split
+    print("Removing near-duplicate reviews...")
+    rows_before = len(df)
+    df = drop_near_duplicates(df, 'processed_review', 'sentiment', config['dedup_threshold']).reset_index(drop=True)
+    print(f"Removed {rows_before - len(df)} near-duplicates: {df.shape}")
+
+    df['label'] = df['sentiment'].map(SENTIMENT_MAPPING)
+    print(f"Dataset shape: {df.shape}")
+    print(f"Original sentiment distribution: {df['label'].value_counts().to_dict()}")
+    return df[['processed_review', 'sentiment', 'label']]
+
+
+def split_data(config, df):
+    """Train/validation/test splits and the oversampled training set"""
+    X, y = df['processed_review'], df['label']
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=config['test_size'], random_state=config['random_state'], stratify=y
+    )
+    # Hold out a validation split from the training data for calibration
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train, y_train, test_size=config['validation_size'], random_state=config['random_state'], stratify=y_train
+    )
+    print(f"Original training distribution: {Counter(y_train)}")
+    print(f"Validation samples: {len(X_val)}")
+
+    profiler.stage('oversample')
+    # Handle class imbalance: oversample minority classes to match the majority (positive)
+    train_df = pd.DataFrame({'processed_review': X_train, 'label': y_train})
+    majority_size = (train_df['label'] == 1).sum()
+    train_upsampled = pd.concat([
+        resample(train_df[train_df['label'] == 0], replace=True, n_samples=majority_size, random_state=config['random_state']),
+        train_df[train_df['label'] == 1],
+        resample(train_df[train_df['label'] == 2], replace=True, n_samples=majority_size, random_state=config['random_state']),
+    ])
+    print(f"Upsampled training distribution: {Counter(train_upsampled['label'])}")
+
+    return {
+        'X_train': X_train, 'X_val': X_val, 'X_test': X_test,
+        'y_train': y_train, 'y_val': y_val, 'y_test': y_test,
+        'X_train_upsampled': train_upsampled['processed_review'],
+        'y_train_upsampled': train_upsampled['label'],
+    }
+
+
+def make_vectorizer(config):
+    params = dict(config, ngram_range=tuple(config['ngram_range']), dtype=feature_dtype(config['dtype']))
+    return TfidfVectorizer(**params)
+
+
+def vectorize(config, data):
+    """Fitted TF-IDF vectorizer and compact feature matrices of the three splits"""
+    dtype = feature_dtype(config['dtype'])
+    vectorizer = make_vectorizer(config)
+    features = {
+        'vectorizer': vectorizer,
+        'X_train': compact_sparse(vectorizer.fit_transform(data['X_train_upsampled']), dtype),
+        'X_val': compact_sparse(vectorizer.transform(data['X_val']), dtype),
+        'X_test': compact_sparse(vectorizer.transform(data['X_test']), dtype),
+    }
+
+    matrices = [features[name] for name in ('X_train', 'X_val', 'X_test')]
+    print(f"Vectorizer features: {features['X_train'].shape[1]}")
+    # float64 values with int64 indices/indptr take 16 bytes per stored value plus 8 per row
+    wide_bytes = sum(16 * X.nnz + 8 * (X.shape[0] + 1) for X in matrices)
+    print(f"Feature matrices: {sum(map(sparse_nbytes, matrices)) / 1e6:.1f} MB as {np.dtype(dtype).name} "
+          f"(float64/int64: {wide_bytes / 1e6:.1f} MB)")
+    return features
+
+
+def fit_model(name, params, data, features):
+    return MODEL_CLASSES[name](**params).fit(features['X_train'], data['y_train_upsampled'])
+
+
+def evaluate(config, vectorize_config, data, features, models):
+    """Pick, verify, compact, prune and calibrate the best model and build the serving extras"""
+    X_val, X_test = data['X_val'], data['X_test']
+    y_val, y_test = data['y_val'], data['y_test']
+    vectorizer, X_test_tfidf = features['vectorizer'], features['X_test']
+    dtype = feature_dtype(vectorize_config['dtype'])
+
+    best_model_name, best_accuracy = None, 0
+    print("\nModel Comparison:")
+    print("=" * 50)
+    for name, model in models.items():
+        y_pred = model.predict(X_test_tfidf)
+        accuracy = accuracy_score(y_test, y_pred)
+        print(f"\n{name}:")
+        print(f"Accuracy: {accuracy:.4f}")
+        print("Classification Report:")
+        print(classification_report(y_test, y_pred, target_names=['Negative', 'Positive', 'Neutral']))
+        if accuracy > best_accuracy:
+            best_model_name, best_accuracy = name, accuracy
+    print(f"\nBest model: {best_model_name} (Accuracy: {best_accuracy:.4f})")
+
+    # The reduced-precision path must not change what the models predict
+    if dtype != np.float64:
+        print("\nVerifying float32 features against a float64 reference...")
+        reference_vectorizer = clone(vectorizer).set_params(dtype=np.float64)
+        X_reference_train = reference_vectorizer.fit_transform(data['X_train_upsampled'])
+        X_reference_test = reference_vectorizer.transform(X_test)
+        for name, model in models.items():
+            # Trees already train and predict on float32 internally, so only the NB models are refitted
+            reference_model = model if name == 'RandomForest' else clone(model).fit(X_reference_train, data['y_train_upsampled'])
+            difference, agreement = compare_outputs(model, X_test_tfidf, reference_model, X_reference_test)
+            print(f"{name}: max probability difference {difference:.2e}, label agreement {agreement * 100:.2f}%")
+            if difference > FEATURE_TOLERANCE:
+                raise ValueError(f"{name} float32 outputs differ by {difference:.2e} (tolerance {FEATURE_TOLERANCE:.0e})")
+        del X_reference_train, X_reference_test
+
+    profiler.stage('compact forest')
+    # Compact the RandomForest into flat node arrays before it is exported
+    print("\nCompacting RandomForest...")
+    rf_model = models['RandomForest']
+    compact_rf = CompactForest(rf_model)
+    rf_proba = rf_model.predict_proba(X_test_tfidf)
+    compact_proba = compact_rf.predict_proba(X_test_tfidf)
+    if not (rf_proba.argmax(axis=1) == compact_proba.argmax(axis=1)).all():
+        raise ValueError("Compacted forest predictions differ from the RandomForest's")
+    print(f"Nodes: {compact_rf.n_nodes}, features used: {compact_rf.n_used_features}/{rf_model.n_features_in_}")
+    print(f"Max probability difference: {np.abs(rf_proba - compact_proba).max():.2e}")
+    print(f"Pickled size: {len(pickle.dumps(rf_model)) / 1e6:.2f} MB -> {len(pickle.dumps(compact_rf)) / 1e6:.2f} MB")
+
+    single_row = X_test_tfidf[:1]
+    start = time.perf_counter()
+    for _ in range(20):
+        rf_model.predict_proba(single_row)
+    rf_latency = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for _ in range(20):
+        compact_rf.predict_proba(single_row)
+    compact_latency = (time.perf_counter() - start) / 20
+    print(f"Single-row latency: {rf_latency * 1000:.2f} ms -> {compact_latency * 1000:.2f} ms")
+
+    models = dict(models, RandomForest=compact_rf)
+    best_model = models[best_model_name]
+
+    profiler.stage('feature selection')
+    # Prune the vocabulary and the models' feature arrays to the most informative features
+    print("\nSelecting features...")
+    feature_ranking = rank_features(features['X_train'], data['y_train_upsampled'])
+    n_features = features['X_train'].shape[1]
+    selection_results = []
+    print(f"{'Features':>10} {'Val accuracy':>14} {'Size (MB)':>10}")
+    for count in sorted({n_features // d for d in config['feature_divisors']} - {0}, reverse=True):
+        keep = feature_ranking[:count]
+        pruned_vectorizer = prune_vectorizer(vectorizer, keep)
+        pruned_model = prune_model(best_model, keep)
+        accuracy = accuracy_score(y_val, pruned_model.predict(pruned_vectorizer.transform(X_val)))
+        size = (len(pickle.dumps(pruned_vectorizer)) + len(pickle.dumps(pruned_model))) / 1e6
+        selection_results.append({'n_features': count, 'accuracy': accuracy, 'size_mb': size})
+        print(f"{count:>10} {accuracy:>14.4f} {size:>10.2f}")
+
+    selected_count = select_feature_count(selection_results)
+    keep = feature_ranking[:selected_count]
+    vectorizer = prune_vectorizer(vectorizer, keep)
+    models = {name: prune_model(model, keep) for name, model in models.items()}
+    best_model, compact_rf = models[best_model_name], models['RandomForest']
+    X_val_tfidf = compact_sparse(vectorizer.transform(X_val), dtype)
+    X_test_tfidf = compact_sparse(vectorizer.transform(X_test), dtype)
+    best_accuracy = accuracy_score(y_test, best_model.predict(X_test_tfidf))
+    print(f"Keeping {selected_count} of {n_features} features (test accuracy: {best_accuracy:.4f})")
+
+    profiler.stage('calibrate')
+    # Calibrate the best model's confidence on the held-out validation split
+    print("\nCalibrating prediction probabilities...")
+    calibration = fit_calibration(best_model.predict_proba(X_val_tfidf), y_val, best_model.classes_)
+    test_proba = best_model.predict_proba(X_test_tfidf)
+    ece_before = expected_calibration_error(test_proba, y_test, best_model.classes_)
+    ece_after = expected_calibration_error(apply_calibration(test_proba, calibration), y_test, best_model.classes_)
+    print(f"Expected calibration error: {ece_before:.4f} raw -> {ece_after:.4f} calibrated")
+    print(f"Lookup table sizes: {[len(x) for x in calibration['x']]}")
+
+    profiler.stage('short text')
+    # Lookup table that answers very short reviews before the TF-IDF transform at serving time
+    print("\nBuilding short-text lookup table...")
+    short_texts = pd.concat([data['X_train'], X_val])
+    short_table = build_lookup(short_texts.tolist(), pd.concat([data['y_train'], y_val]).tolist(), ENGLISH_STOP_WORDS,
+                               best_model.predict(compact_sparse(vectorizer.transform(short_texts), dtype)).tolist())
+    short_lookup = ShortTextLookup(short_table)
+    print(f"Exact phrases: {len(short_table['exact'])}, n-grams: {len(short_table['ngrams'])}")
+
+    test_texts, test_labels = X_test.tolist(), y_test.to_numpy()
+    short_rows = [i for i, text in enumerate(test_texts) if 0 < len(phrase_tokens(text, short_lookup.fillers)) <= MAX_WORDS]
+    start = time.perf_counter()
+    covered_rows, short_labels, _, short_stages = short_lookup.lookup_many(test_texts)
+    lookup_time = time.perf_counter() - start
+    fallback_rows = sorted(set(short_rows) - set(covered_rows))
+    test_pred = best_model.predict(X_test_tfidf)
+    print(f"Short test reviews (<= {MAX_WORDS} words): {len(short_rows)} of {len(test_texts)}; "
+          f"covered by the lookup: {len(covered_rows)} ({len(covered_rows) / max(len(short_rows), 1) * 100:.1f}%, "
+          f"{short_stages.count('short_exact')} exact)")
+    if covered_rows:
+        # Deduplication keeps copies of training phrases out of the test split, so exact hits here are
+        # rephrasings or phrases with a different label: a pessimistic estimate for repeated live traffic
+        print(f"Covered accuracy: lookup {np.mean(np.array(short_labels) == test_labels[covered_rows]):.4f} "
+              f"vs model {np.mean(test_pred[covered_rows] == test_labels[covered_rows]):.4f} "
+              f"(agreement {np.mean(np.array(short_labels) == test_pred[covered_rows]):.4f})")
+    if fallback_rows:
+        print(f"Short reviews falling back to the model: accuracy {np.mean(test_pred[fallback_rows] == test_labels[fallback_rows]):.4f}")
+    print(f"Lookup time: {lookup_time / len(test_texts) * 1e6:.1f} us per test review")
+
+    profiler.stage('cascade')
+    # Build the confidence-gated cascade: fast NB for everything, RandomForest for uncertain texts
+    print("\nBuilding confidence-gated cascade...")
+    nb_models = {name: models[name] for name in ('ComplementNB', 'MultinomialNB')}
+    fast_name = max(nb_models, key=lambda name: accuracy_score(y_val, nb_models[name].predict(X_val_tfidf)))
+    cascade = {
+        'fast_name': fast_name,
+        'fast_model': nb_models[fast_name],
+        'fast_calibration': fit_calibration(nb_models[fast_name].predict_proba(X_val_tfidf), y_val, rf_model.classes_),
+        'slow_name': 'RandomForest',
+        'slow_model': compact_rf,
+        'slow_calibration': fit_calibration(compact_rf.predict_proba(X_val_tfidf), y_val, rf_model.classes_)
+    }
+
+    # Tune the routing threshold on the validation split
+    fast_pred, fast_conf = score_stage(cascade['fast_model'], X_val_tfidf, cascade['fast_calibration'])
+    slow_pred, _ = score_stage(compact_rf, X_val_tfidf)
+    cascade['threshold'], val_accuracy, val_routed = tune_cascade_threshold(fast_pred, fast_conf, slow_pred, y_val)
+    print(f"Fast stage: {fast_name}, threshold: {cascade['threshold']:.2f}")
+    print(f"Validation accuracy: {val_accuracy:.4f} with {val_routed * 100:.1f}% routed to RandomForest")
+
+    start = time.perf_counter()
+    cascade_pred, _, cascade_stages = predict_cascade(X_test_tfidf, cascade)
+    cascade_time = time.perf_counter() - start
+    start = time.perf_counter()
+    compact_rf.predict(X_test_tfidf)
+    rf_time = time.perf_counter() - start
+    print(f"Cascade test accuracy: {accuracy_score(y_test, cascade_pred):.4f} "
+          f"({(cascade_stages == 'slow').mean() * 100:.1f}% answered by RandomForest)")
+    print(f"Test set scoring time: cascade {cascade_time * 1000:.1f} ms vs RandomForest {rf_time * 1000:.1f} ms")
+
+    # Baseline for the API's drift monitor: the test split as the served model scores it
+    test_pred, test_confidence = score_stage(best_model, X_test_tfidf, calibration)
+    return {
+        'best_model_name': best_model_name,
+        'best_model': best_model,
+        'best_accuracy': best_accuracy,
+        'vectorizer': vectorizer,
+        'calibration': calibration,
+        'cascade': cascade,
+        # Document frequencies of the final vocabulary, so incremental_training.py can fold in new reviews
+        'incremental_state': build_state(vectorizer, data['X_train_upsampled'].tolist(), X_val.tolist()),
+        'short_table': short_table,
+        'drift_baseline': DriftMonitor(vectorizer).sketch(test_texts, test_pred, test_confidence),
+    }
+
+
+def quantized_path(bits):
+    return QUANTIZED_FILE.format(bits=bits)
+
+
+def export(artifacts, quantize_bits=()):
+    """Write the serving artifacts to the working directory"""
+    best_model = artifacts['best_model']
+    # Save the best model and vectorizer
+    joblib.dump(best_model, 'sentiment_model.pkl')
+    joblib.dump(artifacts['vectorizer'], 'tfidf_vectorizer.pkl')
+    joblib.dump(artifacts['calibration'], 'calibration.pkl')
+    joblib.dump(artifacts['cascade'], 'cascade.pkl')
+    joblib.dump(artifacts['incremental_state'], STATE_FILE)
+    save_lookup(LOOKUP_FILE, artifacts['short_table'])
+    save_baseline(BASELINE_FILE, artifacts['drift_baseline'], 'test split')
+
+    # NumPy-only artifacts for fast API cold starts (NB models only). Artifacts of an earlier
+    # model are removed so the API cannot serve them next to the new pickles
+    exported = ['sentiment_model.npz'] + [quantized_path(bits) for bits in quantize_bits]
+    if not isinstance(best_model, (ComplementNB, MultinomialNB)):
+        exported = []
+    for path in ['sentiment_model.npz'] + [quantized_path(bits) for bits in QUANTIZED_DTYPES]:
+        if path not in exported and os.path.exists(path):
+            os.remove(path)
+            print(f"Removed stale {path}")
+    fingerprint = pickle_fingerprint('sentiment_model.pkl', 'tfidf_vectorizer.pkl')
+    for bits, path in zip([None] + list(quantize_bits), exported):
+        export_compact_model(path, artifacts['vectorizer'], best_model, artifacts['calibration'],
+                             quantize_bits=bits, fingerprint=fingerprint)
+        print(f"{'Compact' if bits is None else 'Quantized'} serving artifact saved to {path}")
+
+
+def report_quantization(quantize_bits, texts, labels):
+    """Size, test accuracy and served-confidence deviation of the quantized artifacts vs sentiment_model.npz"""
+    print("\nQuantized artifacts vs the float compact model (test split):")
+    vectorizer, model, calibration = load_compact_model('sentiment_model.npz')
+    start = time.perf_counter()
+    float_pred, float_confidence = score_stage(model, vectorizer.transform(texts), calibration)
+    float_time = time.perf_counter() - start
+    # Sizes are measured the same way for every artifact, so the columns show the quantization gain
+    # apart from the compression the quantized files are also saved with
+    print(f"{'Artifact':<28} {'Raw (KB)':>9} {'Zlib (KB)':>10} {'File (KB)':>10} {'Accuracy':>9} {'Agreement':>10} "
+          f"{'Max conf diff':>14} {'Mean conf diff':>15} {'Time (ms)':>10}")
+    raw, compressed = artifact_sizes('sentiment_model.npz')
+    print(f"{'sentiment_model.npz':<28} {raw / 1024:>9.1f} {compressed / 1024:>10.1f} "
+          f"{os.path.getsize('sentiment_model.npz') / 1024:>10.1f} "
+          f"{np.mean(float_pred == labels):>9.4f} {1:>10.4f} {0:>14.2e} {0:>15.2e} {float_time * 1000:>10.1f}")
+    for bits in quantize_bits:
+        vectorizer, model, calibration = load_compact_model(quantized_path(bits))
+        start = time.perf_counter()
+        pred, confidence = score_stage(model, vectorizer.transform(texts), calibration)
+        elapsed = time.perf_counter() - start
+        difference = np.abs(np.asarray(confidence) - np.asarray(float_confidence))
+        raw, compressed = artifact_sizes(quantized_path(bits))
+        print(f"{quantized_path(bits):<28} {raw / 1024:>9.1f} {compressed / 1024:>10.1f} "
+              f"{os.path.getsize(quantized_path(bits)) / 1024:>10.1f} "
+              f"{np.mean(pred == labels):>9.4f} {np.mean(pred == float_pred):>10.4f} "
+              f"{difference.max(initial=0.0):>14.2e} {difference.mean():>15.2e} {elapsed * 1000:>10.1f}")
+
+
+def report_short_reviews(vectorizer, model):
+    """Test short positive reviews with the new model"""
+    print("\n" + "="*60)
+    print("TESTING SHORT POSITIVE REVIEWS WITH ENHANCED MODEL")
+    print("="*60)
+
+    short_test_reviews = [
+        "I really enjoyed",
+        "I really enjoyed the experience",
+        "Great service",
+        "Excellent care",
+        "Amazing doctor",
+        "Wonderful experience",
+        "Best hospital ever",
+        "Love this place",
+        "Fantastic treatment",
+        "Outstanding care",
+        "Perfect experience",
+        "Highly recommend",
+        "Very satisfied",
+        "Great experience",
+        "Excellent service",
+        "Amazing staff",
+        "Wonderful care",
+        "Best experience",
+        "Love the staff",
+        "Fantastic service"
+    ]
+
+    positive_count = 0
+    neutral_count = 0
+    negative_count = 0
+
+    for i, review in enumerate(short_test_reviews, 1):
+        text_vectorized = vectorizer.transform([review])
+        prediction = model.predict(text_vectorized)[0]
+        probability = model.predict_proba(text_vectorized)[0]
+
+        sentiment_map = {0: 'Negative', 1: 'Positive', 2: 'Neutral'}
+        sentiment = sentiment_map[prediction]
+        confidence = max(probability) * 100
+
+        print(f"{i:2d}. Review: '{review}'")
+        print(f"    Sentiment: {sentiment} (Confidence: {confidence:.1f}%)")
+
+        if sentiment == 'Positive':
+            positive_count += 1
+        elif sentiment == 'Neutral':
+            neutral_count += 1
+        else:
+            negative_count += 1
+
+    print("\n" + "="*60)
+    print("SHORT TEXT CLASSIFICATION RESULTS:")
+    print(f"Positive classifications: {positive_count}/{len(short_test_reviews)} ({positive_count/len(short_test_reviews)*100:.1f}%)")
+    print(f"Neutral classifications: {neutral_count}/{len(short_test_reviews)} ({neutral_count/len(short_test_reviews)*100:.1f}%)")
+    print(f"Negative classifications: {negative_count}/{len(short_test_reviews)} ({negative_count/len(short_test_reviews)*100:.1f}%)")
+
+    if neutral_count == 0 and negative_count == 0:
+        print("\n✅ PERFECT! All short positive reviews correctly classified!")
+    elif neutral_count + negative_count < 3:
+        print(f"\n✅ GOOD! Only {neutral_count + negative_count} misclassifications - significant improvement!")
     else:
-        negative_count += 1
-
-print("\n" + "="*60)
-print("SHORT TEXT CLASSIFICATION RESULTS:")
-print(f"Positive classifications: {positive_count}/{len(short_test_reviews)} ({positive_count/len(short_test_reviews)*100:.1f}%)")
-print(f"Neutral classifications: {neutral_count}/{len(short_test_reviews)} ({neutral_count/len(short_test_reviews)*100:.1f}%)")
-print(f"Negative classifications: {negative_count}/{len(short_test_reviews)} ({negative_count/len(short_test_reviews)*100:.1f}%)")
-
-if neutral_count == 0 and negative_count == 0:
-    print("\n✅ PERFECT! All short positive reviews correctly classified!")
-elif neutral_count + negative_count < 3:
-    print(f"\n✅ GOOD! Only {neutral_count + negative_count} misclassifications - significant improvement!")
-else:
-    print(f"\n⚠️  Still {neutral_count + negative_count} misclassifications - may need further enhancement")  
\ No newline at end of file
+        print(f"\n⚠️  Still {neutral_count + negative_count} misclassifications - may need further enhancement")
+
+
+def main(argv=None):
+    global profiler
+    parser = argparse.ArgumentParser(description="Train, evaluate and export the sentiment models")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directory of cached stage outputs")
+    parser.add_argument('--no-cache', action='store_true', help="Run every stage without reading or writing the cache")
+    parser.add_argument('--force', action='append', default=[], choices=STAGES,
+                        help="Re-run a stage even if its output is cached (repeatable)")
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.KEY=VALUE',
+                        help="Override a CONFIG value, e.g. models.ComplementNB.alpha=0.3 (repeatable)")
+    parser.add_argument('--quantize', type=int, action='append', default=[], choices=sorted(QUANTIZED_DTYPES),
+                        metavar='BITS', help="Also export sentiment_model.int<BITS>.npz with 8 or 16-bit "
+                                             "log-probabilities for memory-constrained hosts (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        config = apply_overrides(copy.deepcopy(CONFIG), args.set)
+        feature_dtype(config['vectorize']['dtype'])
+    except (KeyError, ValueError) as e:
+        parser.error(str(e))
+    profiler = StageProfiler(os.environ.get('SENTIMENT_PROFILE'))
+    cache = StageCache(args.cache_dir, enabled=not args.no_cache, force=args.force)
+
+    def run(name, stage_config, inputs, compute):
+        profiler.stage(name)
+        return cache.run(name, stage_config, inputs, compute)
+
+    print("Loading and combining datasets...")
+    # A failed UCI fetch returns None, which is not cached, so the next run tries again
+    uci_key, drug_df = run('uci', {'dataset_id': UCI_DATASET_ID}, [], load_drug_reviews_data)
+    try:
+        prepare_key, df = run('prepare', config['prepare'],
+                              [uci_key if drug_df is not None else None, {path: file_digest(path) for path in DATA_FILES}],
+                              lambda: prepare_data(config['prepare'], drug_df))
+    except FileNotFoundError as e:
+        print(e)
+        return 1
+
+    split_key, data = run('split', config['split'], [prepare_key], lambda: split_data(config['split'], df))
+    vectorize_key, features = run('vectorize', config['vectorize'], [split_key],
+                                  lambda: vectorize(config['vectorize'], data))
+
+    # Train multiple models for comparison
+    print("\nTraining models...")
+    models, fit_keys = {}, {}
+    for name, params in config['models'].items():
+        fit_keys[name], models[name] = run(f'fit {name}', params, [split_key, vectorize_key],
+                                           lambda: fit_model(name, params, data, features))
+
+    _, artifacts = run('evaluate', config['evaluate'], [split_key, vectorize_key, fit_keys],
+                       lambda: evaluate(config['evaluate'], config['vectorize'], data, features, models))
+
+    profiler.stage('export')
+    export(artifacts, args.quantize)
+    profiler.finish()
+    if args.quantize and isinstance(artifacts['best_model'], (ComplementNB, MultinomialNB)):
+        report_quantization(args.quantize, data['X_test'].tolist(), data['y_test'].to_numpy())
+
+    print(f"\nModel trained and saved successfully!")
+    print(f"Stages: {', '.join(f'{name} {status}' for name, _, status in cache.runs)}")
+    print(f"Training samples: {len(data['X_train_upsampled'])}")
+    print(f"Testing samples: {len(data['X_test'])}")
+    print(f"Best model: {artifacts['best_model_name']}")
+    print(f"Best accuracy: {artifacts['best_accuracy']:.4f}")
+
+    report_short_reviews(artifacts['vectorizer'], artifacts['best_model'])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())